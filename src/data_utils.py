@@ -7,12 +7,46 @@ This module provides helper functions for:
 - Data validation and cleaning
 """
 
+import logging
+import os
 import pandas as pd
 import numpy as np
 import geopandas as gpd
-from typing import Optional, Dict, List
-import warnings
-warnings.filterwarnings('ignore')
+import shapely
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Optional, Dict, List, Union
+
+logger = logging.getLogger(__name__)
+
+try:
+    import dask_geopandas
+except ImportError:
+    dask_geopandas = None
+
+# Below this many zip codes dask's partitioning and scheduling costs more
+# than a single nearest-neighbour query
+DASK_MIN_ROWS = 10_000
+
+
+def pad_zip_codes(zip_codes: pd.Series) -> pd.Series:
+    """
+    Zero-pad zip codes to 5 characters.
+    
+    Uses the Arrow-backed string dtype so the padding runs as a vectorized
+    kernel over a contiguous buffer instead of per-object Python strings.
+    
+    Parameters
+    ----------
+    zip_codes : pd.Series
+        Zip codes as strings or integers
+    
+    Returns
+    -------
+    pd.Series
+        Zero-padded zip codes with 'string[pyarrow]' dtype
+    """
+    return zip_codes.astype('string[pyarrow]').str.zfill(5)
 
 
 def load_nyc_zip_codes(file_path: str) -> gpd.GeoDataFrame:
@@ -38,12 +72,127 @@ def load_nyc_zip_codes(file_path: str) -> gpd.GeoDataFrame:
     
     # Ensure zip_code is string
     if 'zip_code' in gdf.columns:
-        gdf['zip_code'] = gdf['zip_code'].astype(str).str.zfill(5)
+        gdf['zip_code'] = pad_zip_codes(gdf['zip_code'])
     
     return gdf
 
 
-def calculate_area_from_geometry(gdf: gpd.GeoDataFrame, crs: str = 'EPSG:3857') -> pd.Series:
+def file_info(
+    file_path: Union[str, Path],
+    cache: Optional[Dict[str, tuple]] = None
+) -> tuple:
+    """
+    Return (exists, size in bytes, mtime in ns) for a file.
+    
+    Parameters
+    ----------
+    file_path : str or Path
+        Path to the file
+    cache : dict, optional
+        Results by absolute path, owned by the caller. A path found in it is
+        not stat'ed again; new results are added to it.
+    
+    Returns
+    -------
+    tuple
+        (exists, size, mtime_ns); (False, 0, 0) for a missing file
+    """
+    path = os.path.abspath(file_path)
+    info = cache.get(path) if cache is not None else None
+    if info is None:
+        try:
+            st = os.stat(path)
+            info = (True, st.st_size, st.st_mtime_ns)
+        except FileNotFoundError:
+            info = (False, 0, 0)
+        if cache is not None:
+            cache[path] = info
+    return info
+
+
+def find_processed_file(
+    stem: str,
+    processed_dir: str = 'data/processed'
+) -> Optional[Path]:
+    """
+    Locate a processed layer, preferring GeoParquet over GeoJSON.
+    
+    A GeoJSON that is newer than the GeoParquet (e.g. from a re-run of an
+    upstream stage with `--geojson` only) is returned instead, so a stale
+    GeoParquet never shadows it.
+    
+    Parameters
+    ----------
+    stem : str
+        File name without extension (e.g. 'nyc_zip_codes_with_poultry')
+    processed_dir : str
+        Directory holding the processed layers
+    
+    Returns
+    -------
+    Path or None
+        Path to the '.parquet' or '.geojson' file, or None if neither exists
+    """
+    found = {}
+    for suffix in ('.parquet', '.geojson'):
+        path = Path(processed_dir) / f'{stem}{suffix}'
+        try:
+            found[suffix] = (path, path.stat().st_mtime_ns)
+        except FileNotFoundError:
+            pass
+    if not found:
+        return None
+    if '.parquet' in found and '.geojson' in found:
+        if found['.geojson'][1] > found['.parquet'][1]:
+            return found['.geojson'][0]
+    return found.get('.parquet', found.get('.geojson'))[0]
+
+
+def read_geodata(file_path: Union[str, Path]) -> gpd.GeoDataFrame:
+    """
+    Read a GeoParquet file or any vector format supported by read_file.
+    
+    Parameters
+    ----------
+    file_path : str or Path
+        Path to a '.parquet' file or a GeoJSON/Shapefile/etc.
+    
+    Returns
+    -------
+    gpd.GeoDataFrame
+        Loaded GeoDataFrame
+    """
+    if Path(file_path).suffix == '.parquet':
+        return gpd.read_parquet(file_path)
+    return gpd.read_file(file_path, engine='pyogrio', use_arrow=True)
+
+
+def project_geometry(gdf: gpd.GeoDataFrame, crs: str = 'EPSG:3857') -> gpd.GeoDataFrame:
+    """
+    Reproject a GeoDataFrame, skipping the transform if it is already in `crs`.
+    
+    Parameters
+    ----------
+    gdf : gpd.GeoDataFrame
+        GeoDataFrame with geometry
+    crs : str
+        Target CRS (Web Mercator by default)
+    
+    Returns
+    -------
+    gpd.GeoDataFrame
+        GeoDataFrame in the target CRS
+    """
+    if gdf.crs is not None and gdf.crs == crs:
+        return gdf
+    return gdf.to_crs(crs)
+
+
+def calculate_area_from_geometry(
+    gdf: gpd.GeoDataFrame,
+    crs: str = 'EPSG:3857',
+    projected_gdf: Optional[gpd.GeoDataFrame] = None
+) -> pd.Series:
     """
     Calculate area in square kilometers from geometry.
     
@@ -53,14 +202,21 @@ def calculate_area_from_geometry(gdf: gpd.GeoDataFrame, crs: str = 'EPSG:3857')
         GeoDataFrame with geometry
     crs : str
         CRS to use for area calculation (Web Mercator by default)
+    projected_gdf : gpd.GeoDataFrame, optional
+        `gdf` already projected to a planar CRS. If it has an 'area_m2'
+        column that is used directly.
     
     Returns
     -------
     pd.Series
         Area in square kilometers
     """
-    gdf_projected = gdf.to_crs(crs)
-    area_m2 = gdf_projected.geometry.area
+    if projected_gdf is None:
+        projected_gdf = project_geometry(gdf, crs)
+    if 'area_m2' in projected_gdf.columns:
+        area_m2 = projected_gdf['area_m2']
+    else:
+        area_m2 = projected_gdf.geometry.area
     area_km2 = area_m2 / 1e6
     return area_km2
 
@@ -90,19 +246,14 @@ def merge_population_data(
     gpd.GeoDataFrame
         Merged GeoDataFrame
     """
-    # Ensure zip codes are strings and zero-padded
-    population_df = population_df.copy()
-    population_df[zip_col] = population_df[zip_col].astype(str).str.zfill(5)
-    
-    zip_gdf = zip_gdf.copy()
-    if 'zip_code' in zip_gdf.columns:
-        zip_gdf['zip_code'] = zip_gdf['zip_code'].astype(str).str.zfill(5)
+    # Zero-pad only the join keys instead of copying both frames
+    zip_key = pad_zip_codes(zip_gdf['zip_code'])
+    pop_key = pad_zip_codes(population_df[zip_col])
     
     # Merge
-    merged = zip_gdf.merge(
-        population_df[[zip_col, pop_col]],
-        left_on='zip_code',
-        right_on=zip_col,
+    merged = zip_gdf.assign(zip_code=zip_key).merge(
+        population_df[[pop_col]].assign(zip_code=pop_key),
+        on='zip_code',
         how='left'
     )
     
@@ -115,7 +266,8 @@ def merge_population_data(
 def calculate_water_proximity(
     zip_gdf: gpd.GeoDataFrame,
     water_bodies_gdf: Optional[gpd.GeoDataFrame] = None,
-    method: str = 'distance'
+    method: str = 'distance',
+    projected_gdf: Optional[gpd.GeoDataFrame] = None
 ) -> pd.Series:
     """
     Calculate proximity to water bodies for each zip code.
@@ -128,6 +280,9 @@ def calculate_water_proximity(
         GeoDataFrame with water body geometries
     method : str
         Calculation method: 'distance' or 'overlap'
+    projected_gdf : gpd.GeoDataFrame, optional
+        `zip_gdf` already projected to a planar CRS. If it has an 'area_m2'
+        column that is reused for the 'overlap' method.
     
     Returns
     -------
@@ -139,17 +294,37 @@ def calculate_water_proximity(
         return pd.Series(0.5, index=zip_gdf.index)
     
     # Ensure same CRS
-    zip_gdf = zip_gdf.to_crs('EPSG:3857')
-    water_bodies = water_bodies_gdf.to_crs('EPSG:3857')
+    if projected_gdf is not None:
+        zip_gdf = projected_gdf
+    else:
+        zip_gdf = project_geometry(zip_gdf)
+    water_bodies = project_geometry(water_bodies_gdf, zip_gdf.crs)
     
     if method == 'distance':
-        # Calculate minimum distance to water bodies
-        distances = []
-        for idx, zip_geom in zip_gdf.geometry.items():
-            min_dist = water_bodies.geometry.distance(zip_geom).min()
-            distances.append(min_dist)
+        # Calculate minimum distance to water bodies with a single
+        # nearest-neighbour query against an STRtree of the water geometries
+        tree = shapely.STRtree(water_bodies.geometry.values)
         
-        distances = pd.Series(distances, index=zip_gdf.index)
+        def nearest_distances(geoms: gpd.GeoSeries) -> pd.Series:
+            (zip_idx, _), min_dists = tree.query_nearest(
+                geoms.values,
+                return_distance=True,
+                all_matches=False
+            )
+            distances = np.full(len(geoms), np.nan)
+            distances[zip_idx] = min_dists
+            return pd.Series(distances, index=geoms.index)
+        
+        if dask_geopandas is not None and len(zip_gdf) >= DASK_MIN_ROWS:
+            # Spread the queries over one partition of zip codes per CPU core
+            zip_dgdf = dask_geopandas.from_geopandas(
+                zip_gdf[['geometry']], npartitions=os.cpu_count() or 1
+            )
+            distances = zip_dgdf.geometry.map_partitions(
+                nearest_distances, meta=pd.Series(dtype=np.float64)
+            ).compute()
+        else:
+            distances = nearest_distances(zip_gdf.geometry)
         # Normalize: closer = higher score
         max_dist = distances.max()
         if max_dist > 0:
@@ -158,18 +333,26 @@ def calculate_water_proximity(
             proximity = pd.Series(0.5, index=zip_gdf.index)
     
     elif method == 'overlap':
-        # Calculate overlap with water bodies
-        overlaps = []
-        for idx, zip_geom in zip_gdf.geometry.items():
-            overlap = water_bodies.geometry.intersection(zip_geom).area.sum()
-            zip_area = zip_geom.area
-            if zip_area > 0:
-                overlap_ratio = overlap / zip_area
-            else:
-                overlap_ratio = 0
-            overlaps.append(overlap_ratio)
+        # Calculate overlap with water bodies, only intersecting the
+        # zip/water pairs whose geometries actually touch
+        zip_geoms = np.asarray(zip_gdf.geometry.values)
+        water_geoms = np.asarray(water_bodies.geometry.values)
+        tree = shapely.STRtree(water_geoms)
+        zip_idx, water_idx = tree.query(zip_geoms, predicate='intersects')
+        inter_area = shapely.area(
+            shapely.intersection(zip_geoms[zip_idx], water_geoms[water_idx])
+        )
+        overlap = np.bincount(zip_idx, weights=inter_area, minlength=len(zip_geoms))
+        
+        if 'area_m2' in zip_gdf.columns:
+            zip_area = zip_gdf['area_m2'].to_numpy(dtype=np.float64)
+        else:
+            zip_area = shapely.area(zip_geoms)
+        overlap_ratio = np.divide(
+            overlap, zip_area, out=np.zeros_like(overlap), where=zip_area > 0
+        )
         
-        proximity = pd.Series(overlaps, index=zip_gdf.index)
+        proximity = pd.Series(overlap_ratio, index=zip_gdf.index)
     
     else:
         raise ValueError(f"Unknown method: {method}")
@@ -181,7 +364,9 @@ def calculate_bird_density_from_facilities(
     zip_gdf: gpd.GeoDataFrame,
     facilities_gdf: gpd.GeoDataFrame,
     facility_type_col: Optional[str] = None,
-    capacity_col: Optional[str] = None
+    capacity_col: Optional[str] = None,
+    projected_gdf: Optional[gpd.GeoDataFrame] = None,
+    zip_tree: Optional[shapely.STRtree] = None
 ) -> pd.Series:
     """
     Calculate bird density based on poultry facility locations.
@@ -196,6 +381,13 @@ def calculate_bird_density_from_facilities(
         Column name for facility type
     capacity_col : str, optional
         Column name for facility capacity/bird count
+    projected_gdf : gpd.GeoDataFrame, optional
+        `zip_gdf` already projected to a planar CRS. If given, the spatial
+        join runs against its geometry and facilities are projected to match.
+    zip_tree : shapely.STRtree, optional
+        Spatial index over the zip geometries used for the join (those of
+        `projected_gdf` if given). Pass it in to reuse the index when this is
+        called for several facility datasets.
     
     Returns
     -------
@@ -203,25 +395,36 @@ def calculate_bird_density_from_facilities(
         Bird density scores by zip code
     """
     # Spatial join: facilities within zip codes
-    joined = gpd.sjoin(facilities_gdf, zip_gdf, how='inner', predicate='within')
+    if projected_gdf is not None:
+        zip_geoms = projected_gdf.geometry.values
+        facilities_gdf = project_geometry(facilities_gdf, projected_gdf.crs)
+    else:
+        zip_geoms = zip_gdf.geometry.values
+    if zip_tree is None:
+        zip_tree = shapely.STRtree(zip_geoms)
+    facility_idx, zip_idx = zip_tree.query(
+        facilities_gdf.geometry.values, predicate='within'
+    )
     
-    # Group by zip code and calculate density
-    if capacity_col and capacity_col in joined.columns:
+    # Sum per zip code
+    if capacity_col and capacity_col in facilities_gdf.columns:
         # Use capacity if available
-        bird_counts = joined.groupby('zip_code')[capacity_col].sum()
+        capacity = facilities_gdf[capacity_col].to_numpy(dtype=np.float64)
+        weights = np.nan_to_num(capacity[facility_idx])
     else:
         # Count facilities
-        bird_counts = joined.groupby('zip_code').size()
-    
-    # Merge back to zip codes
-    bird_density = zip_gdf['zip_code'].map(bird_counts).fillna(0)
+        weights = None
+    bird_density = np.bincount(zip_idx, weights=weights, minlength=len(zip_gdf))
+    bird_density = bird_density.astype(np.float64, copy=False)
     
     # Normalize by area if available
     if 'area_km2' in zip_gdf.columns:
-        bird_density = bird_density / zip_gdf['area_km2']
-        bird_density = bird_density.fillna(0)
+        area = zip_gdf['area_km2'].to_numpy(dtype=np.float64)
+        bird_density = np.divide(
+            bird_density, area, out=np.zeros_like(bird_density), where=area > 0
+        )
     
-    return bird_density
+    return pd.Series(bird_density, index=zip_gdf.index)
 
 
 def validate_risk_data(df: pd.DataFrame, required_cols: List[str]) -> Dict[str, bool]:
@@ -240,15 +443,17 @@ def validate_risk_data(df: pd.DataFrame, required_cols: List[str]) -> Dict[str,
     dict
         Dictionary with validation results
     """
-    results = {}
+    # One NaN reduction over all present columns instead of one per column
+    all_na = df[df.columns.intersection(required_cols)].isna().all()
     
+    results = {}
     for col in required_cols:
         if col not in df.columns:
             results[col] = False
-            print(f"WARNING: Required column '{col}' not found")
-        elif df[col].isna().all():
+            logger.warning("Required column '%s' not found", col)
+        elif all_na[col]:
             results[col] = False
-            print(f"WARNING: Column '{col}' has no valid data")
+            logger.warning("Column '%s' has no valid data", col)
         else:
             results[col] = True
     
@@ -282,40 +487,76 @@ def prepare_risk_data(
     """
     result = zip_gdf.copy()
     
-    # Calculate area if not present
-    if 'area_km2' not in result.columns:
-        result['area_km2'] = calculate_area_from_geometry(result)
+    # Derived columns are collected here and attached in a single assign()
+    derived = {}
     
-    # Merge population data
+    # Merge population data (this rebuilds the frame, so it runs first)
     if population_df is not None:
         result = merge_population_data(result, population_df)
     elif 'population' not in result.columns:
-        print("WARNING: No population data provided")
-        result['population'] = 0
+        logger.warning("No population data provided")
+        derived['population'] = 0
+    
+    # Project once and share the projected geometry with every helper below,
+    # but only if one of them needs it
+    projected = None
+    if (facilities_gdf is not None or water_bodies_gdf is not None
+            or 'area_km2' not in result.columns):
+        projected = gpd.GeoDataFrame(geometry=project_geometry(result).geometry)
+        projected['area_m2'] = projected.geometry.area
+    
+    # Calculate area if not present
+    if 'area_km2' in result.columns:
+        area_km2 = result['area_km2']
+    else:
+        area_km2 = calculate_area_from_geometry(result, projected_gdf=projected)
+        derived['area_km2'] = area_km2
+    if projected is not None:
+        projected['area_km2'] = area_km2.values
+    
+    # Bird density and water proximity only read the projected geometry and
+    # shapely releases the GIL, so compute them on worker threads
+    bird_future = water_future = None
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        if facilities_gdf is not None:
+            bird_future = executor.submit(
+                calculate_bird_density_from_facilities,
+                projected, facilities_gdf, projected_gdf=projected
+            )
+        if water_bodies_gdf is not None:
+            water_future = executor.submit(
+                calculate_water_proximity,
+                result, water_bodies_gdf, projected_gdf=projected
+            )
     
     # Calculate bird density
-    if facilities_gdf is not None:
-        result['bird_density'] = calculate_bird_density_from_facilities(
-            result, facilities_gdf
-        )
+    if bird_future is not None:
+        derived['bird_density'] = bird_future.result()
     elif 'bird_density' not in result.columns:
-        print("WARNING: No bird density data provided")
-        result['bird_density'] = 0
+        logger.warning("No bird density data provided")
+        derived['bird_density'] = 0
     
     # Calculate water proximity
-    if water_bodies_gdf is not None:
-        result['water_proximity'] = calculate_water_proximity(
-            result, water_bodies_gdf
-        )
+    if water_future is not None:
+        derived['water_proximity'] = water_future.result()
     elif 'water_proximity' not in result.columns:
-        print("WARNING: No water proximity data provided")
-        result['water_proximity'] = 0
+        logger.warning("No water proximity data provided")
+        derived['water_proximity'] = 0
     
     # Add default values for optional columns if missing
     if 'healthcare_capacity' not in result.columns:
-        result['healthcare_capacity'] = 0.5  # Default medium capacity
+        derived['healthcare_capacity'] = 0.5  # Default medium capacity
     if 'vulnerability_index' not in result.columns:
-        result['vulnerability_index'] = 0.5  # Default medium vulnerability
+        derived['vulnerability_index'] = 0.5  # Default medium vulnerability
+    
+    result = result.assign(**derived)
+    
+    # Areas and bounded scores don't need double precision
+    float32_cols = [
+        'area_km2', 'bird_density', 'water_proximity',
+        'healthcare_capacity', 'vulnerability_index'
+    ]
+    result = result.astype({col: np.float32 for col in float32_cols})
     
     return result
 
@@ -6,12 +6,16 @@ Note: Some downloads may require manual steps or API keys.
 """
 
 import os
+import logging
 import requests
+from concurrent.futures import ThreadPoolExecutor
 import pandas as pd
 import geopandas as gpd
 from pathlib import Path
 from typing import Optional
 
+logger = logging.getLogger(__name__)
+
 
 def setup_data_directories():
     """Create data directory structure."""
@@ -21,7 +25,31 @@ def setup_data_directories():
     print("✓ Data directories created")
 
 
-def download_nyc_zip_boundaries(output_path: str = 'data/raw/nyc_zip_codes.geojson'):
+def download_file(
+    url: str,
+    output_path: str,
+    chunk_size: int = 1 << 16,
+    session: Optional[requests.Session] = None
+):
+    """
+    Stream a URL to disk in fixed-size chunks.
+    
+    Avoids holding the whole response in memory, which matters for large
+    GeoJSON exports such as the NYC hydrography layer. Pass a shared
+    `session` to reuse HTTP connections across downloads.
+    """
+    http = session if session is not None else requests
+    with http.get(url, stream=True, timeout=30) as response:
+        response.raise_for_status()
+        with open(output_path, 'wb') as f:
+            for chunk in response.iter_content(chunk_size=chunk_size):
+                f.write(chunk)
+
+
+def download_nyc_zip_boundaries(
+    output_path: str = 'data/raw/nyc_zip_codes.geojson',
+    session: Optional[requests.Session] = None
+):
     """
     Download NYC zip code boundaries from NYC Open Data.
     
@@ -33,33 +61,32 @@ def download_nyc_zip_boundaries(output_path: str = 'data/raw/nyc_zip_codes.geojs
     
     print(f"Downloading NYC zip code boundaries...")
     try:
-        response = requests.get(url, timeout=30)
-        response.raise_for_status()
-        
-        with open(output_path, 'wb') as f:
-            f.write(response.content)
+        download_file(url, output_path, session=session)
         
         # Verify it's valid GeoJSON
-        gdf = gpd.read_file(output_path)
+        gdf = gpd.read_file(output_path, engine='pyogrio', use_arrow=True)
         print(f"✓ Downloaded {len(gdf)} zip codes to {output_path}")
         print(f"  Columns: {list(gdf.columns)}")
         
-        # Standardize zip code column name
+        # Standardize zip code column name. The file on disk is left as
+        # downloaded; load_nyc_zip_codes applies the same rename on read.
         zip_cols = [col for col in gdf.columns if 'zip' in col.lower() or 'postal' in col.lower()]
         if zip_cols and zip_cols[0] != 'zip_code':
             gdf = gdf.rename(columns={zip_cols[0]: 'zip_code'})
-            gdf.to_file(output_path, driver='GeoJSON')
             print(f"  Renamed column to 'zip_code'")
         
         return gdf
     except Exception as e:
-        print(f"✗ Error downloading: {e}")
+        logger.warning("Error downloading zip code boundaries: %s", e)
         print(f"  Please manually download from:")
         print(f"  https://data.cityofnewyork.us/Business/Zip-Code-Boundaries/i8iw-xf4u")
         return None
 
 
-def download_nyc_water_bodies(output_path: str = 'data/raw/nyc_water_bodies.geojson'):
+def download_nyc_water_bodies(
+    output_path: str = 'data/raw/nyc_water_bodies.geojson',
+    session: Optional[requests.Session] = None
+):
     """
     Download NYC water bodies from NYC Open Data.
     
@@ -70,18 +97,14 @@ def download_nyc_water_bodies(output_path: str = 'data/raw/nyc_water_bodies.geoj
     
     print(f"Downloading NYC water bodies...")
     try:
-        response = requests.get(url, timeout=30)
-        response.raise_for_status()
+        download_file(url, output_path, session=session)
         
-        with open(output_path, 'wb') as f:
-            f.write(response.content)
-        
-        gdf = gpd.read_file(output_path)
+        gdf = gpd.read_file(output_path, engine='pyogrio', use_arrow=True)
         print(f"✓ Downloaded water bodies to {output_path}")
         print(f"  Features: {len(gdf)}")
         return gdf
     except Exception as e:
-        print(f"✗ Error downloading: {e}")
+        logger.warning("Error downloading water bodies: %s", e)
         print(f"  Please manually download from:")
         print(f"  https://data.cityofnewyork.us/Environment/Hydrography/9ar3-6nj9")
         return None
@@ -133,13 +156,16 @@ def validate_zip_code_data(gdf: gpd.GeoDataFrame) -> dict:
     
     # Check zip code format
     if 'zip_code' in gdf.columns:
-        zip_codes = gdf['zip_code'].astype(str)
-        if not zip_codes.str.match(r'^\d{5}$').all():
+        zip_codes = gdf['zip_code'].astype('string[pyarrow]')
+        is_five_digits = (zip_codes.str.len() == 5) & zip_codes.str.isdigit()
+        if not is_five_digits.fillna(False).all():
             results['issues'].append("Some zip codes are not 5-digit format")
     
     # Check for duplicates
     if 'zip_code' in gdf.columns:
-        duplicates = gdf['zip_code'].duplicated().sum()
+        # Factorize to integer codes; every repeat of a code is a duplicate
+        codes, uniques = pd.factorize(gdf['zip_code'], use_na_sentinel=False)
+        duplicates = len(codes) - len(uniques)
         if duplicates > 0:
             results['issues'].append(f"Found {duplicates} duplicate zip codes")
     
@@ -148,6 +174,8 @@ def validate_zip_code_data(gdf: gpd.GeoDataFrame) -> dict:
 
 def main():
     """Main function to set up data directories and download initial data."""
+    logging.basicConfig(format='%(levelname)s: %(message)s')
+    
     print("=" * 60)
     print("H5N1 Risk Mapping - Data Download Helper")
     print("=" * 60)
@@ -155,9 +183,13 @@ def main():
     # Setup directories
     setup_data_directories()
     
-    # Download zip code boundaries
-    print("\n1. Downloading zip code boundaries...")
-    zip_gdf = download_nyc_zip_boundaries()
+    # Download zip code boundaries and water bodies concurrently
+    print("\n1. Downloading zip code boundaries and water bodies...")
+    with requests.Session() as session, ThreadPoolExecutor(max_workers=2) as executor:
+        zip_future = executor.submit(download_nyc_zip_boundaries, session=session)
+        water_future = executor.submit(download_nyc_water_bodies, session=session)
+        zip_gdf = zip_future.result()
+        water_future.result()
     
     if zip_gdf is not None:
         # Validate
@@ -176,10 +208,6 @@ def main():
         if zip_codes:
             create_sample_population_data(zip_codes)
     
-    # Download water bodies
-    print("\n4. Downloading water bodies...")
-    download_nyc_water_bodies()
-    
     print("\n" + "=" * 60)
     print("Data download complete!")
     print("=" * 60)
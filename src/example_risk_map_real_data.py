@@ -15,8 +15,8 @@ import os
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 from risk_map import RiskMap
+from data_utils import find_processed_file
 import geopandas as gpd
-import pandas as pd
 
 
 def main():
@@ -29,13 +29,17 @@ def main():
     
     # Load processed NYC data with poultry, water, and SVI
     print("\n1. Loading NYC zip code data...")
-    # Try to load data with SVI (most complete), fallback to water, then poultry-only
-    data_file = 'data/processed/nyc_zip_codes_with_water_with_svi.geojson'
+    # Try to load data with SVI (most complete), fallback to water, then poultry-only.
+    # The GeoParquet copy of the SVI data is preferred as it loads much faster.
+    data_file = str(find_processed_file('nyc_zip_codes_with_water_with_svi')
+                    or 'data/processed/nyc_zip_codes_with_water_with_svi.parquet')
     if not os.path.exists(data_file):
-        data_file = 'data/processed/nyc_zip_codes_with_water.geojson'
+        data_file = str(find_processed_file('nyc_zip_codes_with_water')
+                        or 'data/processed/nyc_zip_codes_with_water.parquet')
         print("  Note: Using data without SVI (vulnerability and healthcare will use defaults)")
     if not os.path.exists(data_file):
-        data_file = 'data/processed/nyc_zip_codes_with_poultry.geojson'
+        data_file = str(find_processed_file('nyc_zip_codes_with_poultry')
+                        or 'data/processed/nyc_zip_codes_with_poultry.parquet')
         print("  Note: Using data without water proximity (using defaults)")
     
     if not os.path.exists(data_file):
@@ -43,12 +47,15 @@ def main():
         print("  Please run: python src/process_svi_data.py first")
         return
     
-    gdf = gpd.read_file(data_file)
+    if data_file.endswith('.parquet'):
+        gdf = gpd.read_parquet(data_file)
+    else:
+        gdf = gpd.read_file(data_file, engine='pyogrio', use_arrow=True)
     print(f"   Loaded {len(gdf)} zip codes")
     
     # Prepare data for RiskMap
     # The poultry_susceptibility column will be used as bird_density
-    data = pd.DataFrame(gdf.drop(columns=['geometry']))
+    data = gdf.drop(columns='geometry')
     
     # Rename poultry_susceptibility to bird_density for the risk map
     if 'poultry_susceptibility' in data.columns:
@@ -133,8 +140,12 @@ def main():
     
     # Create GeoDataFrame with risk scores for visualization
     print("\n7. Preparing data for visualization...")
+    # Build from the zip codes, scores and geometry only, rather than
+    # concatenating onto a slice of the full input frame
+    risk_columns = {'zip_code': gdf['zip_code']}
+    risk_columns.update(risk_scores.items())
     risk_map.risk_map_gdf = gpd.GeoDataFrame(
-        pd.concat([gdf[['zip_code', 'geometry']], risk_scores], axis=1)
+        risk_columns, geometry=gdf.geometry, crs=gdf.crs
     )
     
     # Export results
@@ -4,19 +4,64 @@ Prepare risk map files for sharing.
 Creates a shareable package with instructions.
 """
 
+import contextlib
 import os
 import shutil
 import zipfile
 from pathlib import Path
 from datetime import datetime
 
+# Use zlib-ng's faster (output-compatible) DEFLATE for the HTML if available.
+# zlib-ng's level 1 trades a lot of ratio for speed, while its level 3 is as
+# fast as stock zlib's level 1 and close to level 6 in size.
+try:
+    from zlib_ng import zlib_ng
+    HTML_COMPRESSLEVEL = 3
+except ImportError:
+    zlib_ng = None
+    HTML_COMPRESSLEVEL = 1
+
+# Buffer size for streaming files into the zip (ZipFile.write uses 8 KiB)
+COPY_BUFSIZE = 1024 * 1024
+
+@contextlib.contextmanager
+def deflate_module(zlib_module):
+    """
+    Make zipfile compress with a zlib-compatible module inside the block.
+    
+    zipfile looks up its zlib module globally, so it is swapped in only for
+    the duration of the block and restored afterwards. Does nothing if
+    `zlib_module` is None.
+    """
+    if zlib_module is None:
+        yield
+        return
+    saved = zipfile.zlib
+    zipfile.zlib = zlib_module
+    try:
+        yield
+    finally:
+        zipfile.zlib = saved
+
+def write_streamed(zipf, file_path, arcname, compress_type, compresslevel=None):
+    """Stream a file into an open zip archive using a large copy buffer."""
+    zinfo = zipfile.ZipInfo.from_file(file_path, arcname)
+    zinfo.compress_type = compress_type
+    # Same per-member level that ZipFile.write sets: public as
+    # compress_level from Python 3.13, only _compresslevel before
+    if hasattr(zipfile.ZipInfo, 'compress_level'):
+        zinfo.compress_level = compresslevel
+    else:
+        zinfo._compresslevel = compresslevel
+    with open(file_path, 'rb') as src, zipf.open(zinfo, 'w') as dest:
+        shutil.copyfileobj(src, dest, COPY_BUFSIZE)
+
 def create_shareable_package():
     """Create a zip file with the map and instructions."""
     
     # File paths
     map_file = 'data/processed/nyc_risk_map.html'
     static_map = 'data/processed/nyc_risk_map.png'
-    output_dir = 'share'
     zip_name = f'h5n1_risk_map_{datetime.now().strftime("%Y%m%d")}.zip'
     
     # Check if map exists
@@ -25,18 +70,6 @@ def create_shareable_package():
         print("Please run: python src/example_risk_map_real_data.py")
         return
     
-    # Create share directory
-    os.makedirs(output_dir, exist_ok=True)
-    
-    # Copy files
-    print("Preparing files for sharing...")
-    shutil.copy2(map_file, os.path.join(output_dir, 'nyc_risk_map.html'))
-    print(f"  ✓ Copied interactive map")
-    
-    if os.path.exists(static_map):
-        shutil.copy2(static_map, os.path.join(output_dir, 'nyc_risk_map.png'))
-        print(f"  ✓ Copied static map")
-    
     # Create README
     readme_content = """H5N1 Risk Map - Interactive Visualization
 ==========================================
@@ -95,17 +128,24 @@ For questions about the risk map or methodology, please refer to:
 Generated: {date}
 """.format(date=datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
     
-    with open(os.path.join(output_dir, 'README.txt'), 'w') as f:
-        f.write(readme_content)
-    print(f"  ✓ Created README.txt")
-    
-    # Create zip file
-    print(f"\nCreating zip file: {zip_name}...")
-    with zipfile.ZipFile(zip_name, 'w', zipfile.ZIP_DEFLATED) as zipf:
-        for file in os.listdir(output_dir):
-            file_path = os.path.join(output_dir, file)
-            zipf.write(file_path, file)
-            print(f"  ✓ Added {file}")
+    # Create zip file, writing the sources directly into the archive.
+    # PNG is already deflate-compressed, so store it as-is; a fast deflate
+    # level is enough for the HTML text. Files are streamed in with a 1 MiB
+    # buffer to cut read/write syscalls.
+    print(f"Creating zip file: {zip_name}...")
+    with zipfile.ZipFile(zip_name, 'w') as zipf:
+        with deflate_module(zlib_ng):
+            write_streamed(zipf, map_file, 'nyc_risk_map.html',
+                           zipfile.ZIP_DEFLATED, HTML_COMPRESSLEVEL)
+        print(f"  ✓ Added interactive map")
+        
+        if os.path.exists(static_map):
+            write_streamed(zipf, static_map, 'nyc_risk_map.png', zipfile.ZIP_STORED)
+            print(f"  ✓ Added static map")
+        
+        zipf.writestr('README.txt', readme_content,
+                      compress_type=zipfile.ZIP_DEFLATED, compresslevel=6)
+        print(f"  ✓ Added README.txt")
     
     zip_size = os.path.getsize(zip_name) / (1024 * 1024)  # MB
     print(f"\n✓ Shareable package created: {zip_name}")
@@ -114,11 +154,6 @@ Generated: {date}
     print(f"  1. Email this file (if under 25 MB)")
     print(f"  2. Upload to file sharing service (Dropbox, Google Drive, etc.)")
     print(f"  3. Share via USB drive or network")
-    
-    # Cleanup
-    print(f"\nCleaning up temporary files...")
-    shutil.rmtree(output_dir)
-    print(f"✓ Done!")
 
 if __name__ == '__main__':
     print("=" * 60)
@@ -6,8 +6,12 @@ This script processes:
 2. 2020 Census Decennial data for official population counts
 """
 
+import re
 import pandas as pd
+import numpy as np
 import geopandas as gpd
+import shapely
+from pyproj import Geod
 from pathlib import Path
 import sys
 import os
@@ -18,6 +22,10 @@ sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 from risk_map import RiskMap
 from data_utils import prepare_risk_data
 
+# Zip code patterns for Census GEO_ID ("860Z200US10001") and NAME ("ZCTA5 10001")
+GEOID_ZIP_PATTERN = re.compile(r'US(\d{5})')
+NAME_ZIP_PATTERN = re.compile(r'(\d{5})')
+
 
 def load_modzcta_data(file_path: str) -> gpd.GeoDataFrame:
     """
@@ -35,8 +43,8 @@ def load_modzcta_data(file_path: str) -> gpd.GeoDataFrame:
     """
     print(f"Loading MODZCTA data from {file_path}...")
     
-    # Read CSV
-    df = pd.read_csv(file_path)
+    # Read CSV (population estimates use thousands separators, e.g. "23,072")
+    df = pd.read_csv(file_path, thousands=',')
     
     # Clean column names
     df.columns = df.columns.str.strip().str.lower()
@@ -47,11 +55,11 @@ def load_modzcta_data(file_path: str) -> gpd.GeoDataFrame:
     elif 'zcta' in df.columns:
         df['zip_code'] = df['zcta'].astype(str).str.zfill(5)
     
-    # Clean population data (remove commas)
+    # Population data (commas already handled by the CSV parser)
     if 'pop_est' in df.columns:
-        df['population'] = df['pop_est'].astype(str).str.replace(',', '').astype(float)
+        df['population'] = df['pop_est'].astype(float)
     elif 'population' in df.columns:
-        df['population'] = df['population'].astype(str).str.replace(',', '').astype(float)
+        df['population'] = df['population'].astype(float)
     
     # Convert geometry from WKT string to GeoSeries
     if 'the_geom' in df.columns:
@@ -61,15 +69,25 @@ def load_modzcta_data(file_path: str) -> gpd.GeoDataFrame:
     else:
         raise ValueError("No geometry column found. Expected 'the_geom' or 'geometry'")
     
-    # Create GeoDataFrame
+    # Create GeoDataFrame (parse all WKT strings in one vectorized call)
     gdf = gpd.GeoDataFrame(
         df,
-        geometry=gpd.GeoSeries.from_wkt(df[geometry_col], crs='EPSG:4326')
+        geometry=shapely.from_wkt(df[geometry_col].to_numpy()),
+        crs='EPSG:4326'
     )
     
-    # Calculate area in km²
-    gdf_projected = gdf.to_crs('EPSG:3857')  # Web Mercator for area calculation
-    gdf['area_km2'] = gdf_projected.geometry.area / 1e6
+    # Calculate geodesic area in km² directly from the WGS84 geometry
+    # (Web Mercator overstates areas by ~1.7x at NYC's latitude). pyproj
+    # adds up signed ring areas, so orient every part counter-clockwise
+    # (holes clockwise) first, otherwise mixed parts cancel out.
+    geod = Geod(ellps='WGS84')
+    oriented = shapely.orient_polygons(gdf.geometry.values)
+    areas_m2 = np.fromiter(
+        (geod.geometry_area_perimeter(geom)[0] for geom in oriented),
+        dtype=np.float64,
+        count=len(gdf)
+    )
+    gdf['area_km2'] = areas_m2 / 1e6
     
     print(f"✓ Loaded {len(gdf)} zip codes")
     print(f"  Population range: {gdf['population'].min():.0f} - {gdf['population'].max():.0f}")
@@ -106,10 +124,10 @@ def load_census_data(file_path: str) -> pd.DataFrame:
     # Extract zip code from GEO_ID or NAME
     if 'GEO_ID' in df.columns:
         # Format: "860Z200US10001" -> extract "10001"
-        df['zip_code'] = df['GEO_ID'].astype(str).str.extract(r'US(\d{5})')[0]
+        df['zip_code'] = df['GEO_ID'].str.extract(GEOID_ZIP_PATTERN, expand=False)
     elif 'NAME' in df.columns:
         # Format: "ZCTA5 10001" -> extract "10001"
-        df['zip_code'] = df['NAME'].astype(str).str.extract(r'(\d{5})')[0]
+        df['zip_code'] = df['NAME'].str.extract(NAME_ZIP_PATTERN, expand=False)
     else:
         print("  WARNING: Could not extract zip codes")
         print(f"  Available columns: {list(df.columns)}")
@@ -129,9 +147,8 @@ def load_census_data(file_path: str) -> pd.DataFrame:
         print("  ERROR: Could not extract zip codes")
         return pd.DataFrame()
     
-    result = df[['zip_code', 'population_census']].copy()
-    result = result.dropna(subset=['zip_code'])
-    result['zip_code'] = result['zip_code'].astype(str).str.zfill(5)
+    # Patterns capture exactly five digits, so no zero-padding is needed
+    result = df[['zip_code', 'population_census']].dropna(subset=['zip_code'])
     
     print(f"✓ Loaded {len(result)} zip codes from Census")
     print(f"  Population range: {result['population_census'].min():.0f} - {result['population_census'].max():.0f}")
@@ -144,29 +161,34 @@ def merge_census_population(gdf: gpd.GeoDataFrame, census_df: pd.DataFrame) -> g
     Merge Census population data with MODZCTA boundaries.
     
     Prefers Census data (more official) but keeps MODZCTA estimates as fallback.
+    The columns are updated on `gdf` in place.
     """
     print("\nMerging Census population data...")
     
-    # Merge
-    gdf = gdf.merge(
-        census_df[['zip_code', 'population_census']],
-        on='zip_code',
-        how='left'
-    )
+    # Look up Census population by zip code and set the columns in place
+    # (a merge or assign would copy the whole GeoDataFrame including geometry)
+    pop_map = dict(zip(census_df['zip_code'].values, census_df['population_census'].values))
+    census_pop = gdf['zip_code'].map(pop_map).astype(float)
     
     # Use Census data if available, otherwise use MODZCTA estimate
-    gdf['population'] = gdf['population_census'].fillna(gdf['population'])
+    gdf['population'] = census_pop.fillna(gdf['population'])
+    gdf['population_census'] = census_pop
     
     # Count how many got updated
-    updated = gdf['population_census'].notna().sum()
+    updated = census_pop.notna().sum()
     print(f"✓ Updated {updated} zip codes with Census data")
     print(f"  {len(gdf) - updated} zip codes using MODZCTA estimates")
     
     return gdf
 
 
-def main():
-    """Main processing function."""
+def main(write_geojson: bool = False):
+    """
+    Main processing function.
+    
+    Writes GeoParquet for the rest of the pipeline; pass `write_geojson`
+    (or `--geojson` on the command line) to also export GeoJSON.
+    """
     print("=" * 60)
     print("NYC H5N1 Risk Mapping - Data Processing")
     print("=" * 60)
@@ -194,15 +216,20 @@ def main():
     output_dir = Path('data/processed')
     output_dir.mkdir(parents=True, exist_ok=True)
     
-    # Save as GeoJSON
-    output_geojson = output_dir / 'nyc_zip_codes.geojson'
-    gdf.to_file(output_geojson, driver='GeoJSON')
-    print(f"\n✓ Saved GeoJSON to {output_geojson}")
+    # Save as GeoParquet
+    output_parquet = output_dir / 'nyc_zip_codes.parquet'
+    gdf.to_parquet(output_parquet, compression='zstd')
+    print(f"\n✓ Saved GeoParquet to {output_parquet}")
+    
+    # Optionally save as GeoJSON (e.g. for web maps)
+    if write_geojson:
+        output_geojson = output_dir / 'nyc_zip_codes.geojson'
+        gdf.to_file(output_geojson, driver='GeoJSON')
+        print(f"✓ Saved GeoJSON to {output_geojson}")
     
     # Save as CSV (without geometry)
     output_csv = output_dir / 'nyc_zip_codes.csv'
-    gdf_drop_geom = pd.DataFrame(gdf.drop(columns=['geometry']))
-    gdf_drop_geom.to_csv(output_csv, index=False)
+    gdf.to_csv(output_csv, index=False, columns=gdf.columns.drop('geometry'))
     print(f"✓ Saved CSV to {output_csv}")
     
     # Create summary
@@ -230,5 +257,5 @@ def main():
 
 
 if __name__ == '__main__':
-    main()
+    main(write_geojson='--geojson' in sys.argv)
 
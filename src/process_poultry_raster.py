@@ -6,10 +6,13 @@ and aggregates them to NYC zip code level.
 """
 
 import rasterio
-from rasterio.mask import mask
+from rasterio.features import geometry_mask, rasterize
+from rasterio.windows import Window, from_bounds
 import geopandas as gpd
 import pandas as pd
 import numpy as np
+import math
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 import sys
 import os
@@ -17,6 +20,37 @@ import os
 # Add src to path
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
+from data_utils import find_processed_file, read_geodata
+
+
+def bounds_window(src: rasterio.DatasetReader, bounds) -> Window:
+    """
+    Get the whole-pixel raster window covering the given bounds.
+    
+    Parameters
+    ----------
+    src : rasterio.DatasetReader
+        Open raster dataset
+    bounds : array-like
+        (minx, miny, maxx, maxy) in the raster's CRS
+    
+    Returns
+    -------
+    Window
+        Window snapped outward to whole pixels and clipped to the raster
+    """
+    window = from_bounds(*bounds, transform=src.transform)
+    col_start = max(math.floor(window.col_off), 0)
+    row_start = max(math.floor(window.row_off), 0)
+    col_stop = min(math.ceil(window.col_off + window.width), src.width)
+    row_stop = min(math.ceil(window.row_off + window.height), src.height)
+    return Window(
+        col_start,
+        row_start,
+        max(col_stop - col_start, 0),
+        max(row_stop - row_start, 0)
+    )
+
 
 def extract_poultry_values_by_zip(
     raster_path: str,
@@ -57,53 +91,110 @@ def extract_poultry_values_by_zip(
         else:
             zip_gdf_proj = zip_gdf.copy()
         
+        # Read only the window covering all zip codes (the raster spans far
+        # more than NYC) and work on that array from here on
+        nodata = src.nodata
+        window = bounds_window(src, zip_gdf_proj.total_bounds)
+        data = src.read(1, window=window)
+        win_transform = src.window_transform(window)
+        print(f"  Read window: {data.shape[0]} x {data.shape[1]} pixels")
+        
         # Extract values for each zip code
         print(f"\nExtracting values for {len(zip_gdf_proj)} zip codes...")
-        poultry_values = []
-        zip_codes = []
+        try:
+            from rasterstats import zonal_stats
+        except ImportError:
+            zonal_stats = None
         
-        for idx, row in zip_gdf_proj.iterrows():
-            zip_code = row['zip_code']
-            geometry = row.geometry
+        zip_codes = list(zip_gdf_proj['zip_code'])
+        if data.size == 0:
+            print("  ⚠️  Zip codes do not overlap the raster")
+            poultry_values = [0.0] * len(zip_codes)
+        elif method in ('mean', 'sum'):
+            # Burn all zip codes into one label raster (1..n, 0 = outside) and
+            # reduce every label at once with bincount
+            labels = rasterize(
+                ((geom, i + 1) for i, geom in enumerate(zip_gdf_proj.geometry)),
+                out_shape=data.shape,
+                transform=win_transform,
+                fill=0,
+                dtype='int32'
+            )
+            if nodata is not None:
+                valid = (labels > 0) & (data != nodata)
+            else:
+                valid = (labels > 0) & ~np.isnan(data)
             
-            try:
-                # Mask raster to zip code boundary
-                out_image, out_transform = mask(
-                    src,
-                    [geometry],
-                    crop=True,
-                    nodata=src.nodata
-                )
-                
-                # Extract valid values (exclude nodata)
-                values = out_image[0]
-                if src.nodata is not None:
-                    valid_values = values[values != src.nodata]
-                else:
-                    valid_values = values[~np.isnan(values)]
-                
-                # Aggregate values
-                if len(valid_values) > 0:
-                    if method == 'mean':
-                        value = float(np.mean(valid_values))
-                    elif method == 'max':
-                        value = float(np.max(valid_values))
+            n_labels = len(zip_gdf_proj) + 1
+            label_values = labels[valid]
+            sums = np.bincount(
+                label_values,
+                weights=data[valid].astype(np.float64),
+                minlength=n_labels
+            )[1:]
+            if method == 'mean':
+                counts = np.bincount(label_values, minlength=n_labels)[1:]
+                # No data in a zip code -> 0.0
+                sums = np.divide(sums, counts, out=np.zeros_like(sums), where=counts > 0)
+            
+            poultry_values = sums.tolist()
+        elif zonal_stats is not None:
+            # Aggregate all polygons in one pass over the in-memory window
+            stat = method if method in ('mean', 'max', 'sum', 'median') else 'mean'
+            stats = zonal_stats(
+                list(zip_gdf_proj.geometry),
+                data,
+                affine=win_transform,
+                stats=[stat],
+                nodata=nodata,
+                all_touched=False
+            )
+            poultry_values = [
+                float(s[stat]) if s[stat] is not None else 0.0  # No data in this zip code
+                for s in stats
+            ]
+        else:
+            # Fall back to masking the window one zip code at a time, spread
+            # over threads (the array is only read, so it can be shared)
+            def extract_zip_value(zip_code, geometry):
+                try:
+                    # Mask window to zip code boundary
+                    inside = geometry_mask(
+                        [geometry],
+                        out_shape=data.shape,
+                        transform=win_transform,
+                        all_touched=False,
+                        invert=True
+                    )
+                    
+                    # Valid values (inside the zip code, excluding nodata)
+                    if nodata is not None:
+                        valid = inside & (data != nodata)
+                    else:
+                        valid = inside & ~np.isnan(data)
+                    
+                    # Aggregate sum/mean in place using where= (max and median
+                    # gather the valid values, which also works for int rasters)
+                    if not valid.any():
+                        return 0.0  # No data in this zip code
+                    if method == 'max':
+                        return float(data[valid].max())
                     elif method == 'sum':
-                        value = float(np.sum(valid_values))
+                        return float(np.sum(data, where=valid, dtype=np.float64))
                     elif method == 'median':
-                        value = float(np.median(valid_values))
+                        return float(np.median(data[valid]))
                     else:
-                        value = float(np.mean(valid_values))
-                else:
-                    value = 0.0  # No data in this zip code
-                
-                poultry_values.append(value)
-                zip_codes.append(zip_code)
-                
-            except Exception as e:
-                print(f"  Warning: Error processing zip {zip_code}: {e}")
-                poultry_values.append(0.0)
-                zip_codes.append(zip_code)
+                        return float(np.mean(data, where=valid, dtype=np.float64))
+                    
+                except ValueError as e:
+                    # Empty or invalid geometries cannot be rasterized
+                    print(f"  Warning: Error processing zip {zip_code}: {e}")
+                    return 0.0
+            
+            with ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
+                poultry_values = list(
+                    executor.map(extract_zip_value, zip_codes, zip_gdf_proj.geometry)
+                )
         
         # Create result series
         result = pd.Series(poultry_values, index=zip_codes, name='poultry_susceptibility')
@@ -116,29 +207,34 @@ def extract_poultry_values_by_zip(
         return result
 
 
-def main():
-    """Main processing function."""
+def main(write_geojson: bool = False):
+    """
+    Main processing function.
+    
+    Writes GeoParquet for the rest of the pipeline; pass `write_geojson`
+    (or `--geojson` on the command line) to also export GeoJSON.
+    """
     print("=" * 60)
     print("Poultry Susceptibility Raster Processing")
     print("=" * 60)
     
     # File paths
     raster_path = 'data/raw/Poultry.tif'
-    zip_geojson = 'data/processed/nyc_zip_codes.geojson'
+    zip_file = find_processed_file('nyc_zip_codes')
     
     # Check if files exist
     if not Path(raster_path).exists():
         print(f"ERROR: {raster_path} not found")
         return
     
-    if not Path(zip_geojson).exists():
-        print(f"ERROR: {zip_geojson} not found")
+    if zip_file is None:
+        print("ERROR: data/processed/nyc_zip_codes.parquet not found")
         print("  Please run: python src/process_nyc_data.py first")
         return
     
     # Load zip code boundaries
-    print(f"\nLoading zip codes from {zip_geojson}...")
-    zip_gdf = gpd.read_file(zip_geojson)
+    print(f"\nLoading zip codes from {zip_file}...")
+    zip_gdf = read_geodata(zip_file)
     print(f"✓ Loaded {len(zip_gdf)} zip codes")
     
     # Extract poultry values
@@ -156,15 +252,20 @@ def main():
     output_dir = Path('data/processed')
     output_dir.mkdir(parents=True, exist_ok=True)
     
-    # Save as GeoJSON
-    output_geojson = output_dir / 'nyc_zip_codes_with_poultry.geojson'
-    zip_gdf.to_file(output_geojson, driver='GeoJSON')
-    print(f"\n✓ Saved to {output_geojson}")
+    # Save as GeoParquet
+    output_parquet = output_dir / 'nyc_zip_codes_with_poultry.parquet'
+    zip_gdf.to_parquet(output_parquet, compression='zstd')
+    print(f"\n✓ Saved to {output_parquet}")
+    
+    # Optionally save as GeoJSON (e.g. for web maps)
+    if write_geojson:
+        output_geojson = output_dir / 'nyc_zip_codes_with_poultry.geojson'
+        zip_gdf.to_file(output_geojson, driver='GeoJSON')
+        print(f"✓ Saved to {output_geojson}")
     
     # Save as CSV
     output_csv = output_dir / 'nyc_zip_codes_with_poultry.csv'
-    zip_gdf_drop_geom = pd.DataFrame(zip_gdf.drop(columns=['geometry']))
-    zip_gdf_drop_geom.to_csv(output_csv, index=False)
+    zip_gdf.to_csv(output_csv, index=False, columns=zip_gdf.columns.drop('geometry'))
     print(f"✓ Saved to {output_csv}")
     
     # Summary statistics
@@ -195,5 +296,5 @@ def main():
 
 
 if __name__ == '__main__':
-    main()
+    main(write_geojson='--geojson' in sys.argv)
 
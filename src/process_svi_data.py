@@ -7,25 +7,41 @@ Extracts vulnerability scores and healthcare access indicators.
 import os
 import sys
 import pandas as pd
+import numpy as np
 import geopandas as gpd
 from pathlib import Path
 
+# Add src to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from data_utils import find_processed_file, read_geodata
+
+# SVI columns used by the extract_* functions (the CSV has ~150 columns)
+SVI_COLUMNS = [
+    'FIPS', 'RPL_THEMES', 'SPL_THEMES',
+    'RPL_THEME1', 'RPL_THEME2', 'RPL_THEME3', 'RPL_THEME4',
+    'EP_UNINSUR', 'EP_NOINT'
+]
+
 def load_svi_data(file_path: str) -> pd.DataFrame:
     """Load and process SVI data from CSV."""
     print(f"Loading SVI data from {file_path}...")
     
-    df = pd.read_csv(file_path)
+    df = pd.read_csv(
+        file_path,
+        usecols=lambda c: c in SVI_COLUMNS,
+        dtype={'FIPS': 'string'}
+    )
     print(f"  Loaded {len(df)} ZCTAs")
     
-    # Extract zip code from FIPS (FIPS is 5-digit ZCTA code)
-    df['zip_code'] = df['FIPS'].astype(str).str.zfill(5)
+    # Filter to NYC zip codes (10001-11697) with a numeric range check on
+    # the FIPS (5-digit ZCTA) code rather than regex matching on strings
+    zcta = pd.to_numeric(df['FIPS'], errors='coerce')
+    nyc_mask = zcta.between(10000, 10999) | zcta.between(11000, 11699)
+    df_nyc = df.loc[nyc_mask].copy()
     
-    # Filter to NYC zip codes (10001-11697)
-    nyc_mask = (
-        (df['zip_code'].str.match(r'^10[0-9]{3}')) |
-        (df['zip_code'].str.match(r'^11[0-6][0-9]{2}'))
-    )
-    df_nyc = df[nyc_mask].copy()
+    # Extract zip code from FIPS
+    df_nyc['zip_code'] = zcta[nyc_mask].astype('int64').astype(str).str.zfill(5)
     print(f"  Found {len(df_nyc)} NYC zip codes")
     
     return df_nyc
@@ -34,19 +50,20 @@ def extract_vulnerability_metrics(df: pd.DataFrame) -> pd.DataFrame:
     """Extract vulnerability metrics from SVI data."""
     print("\nExtracting vulnerability metrics...")
     
-    result = df[['zip_code']].copy()
+    # Collect columns as float32 arrays and build the result in one go
+    cols = {'zip_code': df['zip_code'].to_numpy()}
     
     # Overall SVI rank (0-1, higher = more vulnerable)
     if 'RPL_THEMES' in df.columns:
-        result['vulnerability_index'] = df['RPL_THEMES'] / 100.0  # Normalize to 0-1
+        cols['vulnerability_index'] = df['RPL_THEMES'].to_numpy(dtype=np.float32) / 100.0  # Normalize to 0-1
         print(f"  ✓ Added vulnerability_index (RPL_THEMES)")
     elif 'SPL_THEMES' in df.columns:
         # Use sum of theme percentiles if RPL not available
-        result['vulnerability_index'] = df['SPL_THEMES'] / 400.0  # Normalize
+        cols['vulnerability_index'] = df['SPL_THEMES'].to_numpy(dtype=np.float32) / 400.0  # Normalize
         print(f"  ✓ Added vulnerability_index (SPL_THEMES)")
     else:
         print("  ⚠️  No overall vulnerability index found")
-        result['vulnerability_index'] = 0.5  # Default
+        cols['vulnerability_index'] = np.full(len(df), 0.5, dtype=np.float32)  # Default
     
     # Theme-specific scores (optional, for detailed analysis)
     theme_cols = {
@@ -58,16 +75,17 @@ def extract_vulnerability_metrics(df: pd.DataFrame) -> pd.DataFrame:
     
     for col, new_col in theme_cols.items():
         if col in df.columns:
-            result[new_col] = df[col] / 100.0
+            cols[new_col] = df[col].to_numpy(dtype=np.float32) / 100.0
             print(f"  ✓ Added {new_col}")
     
-    return result
+    # Keep the SVI index so the result aligns with the healthcare indicators
+    return pd.DataFrame(cols, index=df.index)
 
 def extract_healthcare_indicators(df: pd.DataFrame) -> pd.DataFrame:
     """Extract healthcare-related indicators from SVI data."""
     print("\nExtracting healthcare indicators...")
     
-    result = pd.DataFrame()
+    cols = {}
     
     # Healthcare access indicators in SVI
     # EP_UNINSUR: Percentage uninsured (higher = worse access)
@@ -77,22 +95,21 @@ def extract_healthcare_indicators(df: pd.DataFrame) -> pd.DataFrame:
         # Invert: lower uninsured = higher capacity
         # Normalize to 0-1 where 1 = best access (lowest uninsured rate)
         # EP_UNINSUR is already a percentage (0-100), but may have outliers
-        uninsured_pct = (df['EP_UNINSUR'] / 100.0).clip(0, 1)  # Clip to 0-1 range
-        result['healthcare_access_score'] = 1.0 - uninsured_pct
+        uninsured_pct = np.clip(df['EP_UNINSUR'].to_numpy(dtype=np.float32) / 100.0, 0, 1)  # Clip to 0-1 range
         # Ensure final score is also in 0-1 range
-        result['healthcare_access_score'] = result['healthcare_access_score'].clip(0, 1)
+        cols['healthcare_access_score'] = np.clip(1.0 - uninsured_pct, 0, 1)
         print(f"  ✓ Added healthcare_access_score (from EP_UNINSUR)")
-        print(f"    Range: {result['healthcare_access_score'].min():.3f} - {result['healthcare_access_score'].max():.3f}")
+        print(f"    Range: {np.nanmin(cols['healthcare_access_score']):.3f} - {np.nanmax(cols['healthcare_access_score']):.3f}")
     else:
         print("  ⚠️  EP_UNINSUR not found, cannot calculate healthcare access")
     
     if 'EP_NOINT' in df.columns:
         # Internet access as proxy for telehealth capacity
-        no_internet_pct = df['EP_NOINT'] / 100.0
-        result['telehealth_access_score'] = 1.0 - no_internet_pct
+        no_internet_pct = df['EP_NOINT'].to_numpy(dtype=np.float32) / 100.0
+        cols['telehealth_access_score'] = 1.0 - no_internet_pct
         print(f"  ✓ Added telehealth_access_score (from EP_NOINT)")
     
-    return result
+    return pd.DataFrame(cols, index=df.index)
 
 def merge_with_existing_data(svi_df: pd.DataFrame, processed_file: str) -> gpd.GeoDataFrame:
     """Merge SVI data with existing processed NYC zip code data."""
@@ -103,8 +120,19 @@ def merge_with_existing_data(svi_df: pd.DataFrame, processed_file: str) -> gpd.G
         print("  Creating new file with SVI data only...")
         return None
     
-    # Load existing processed data
-    gdf = gpd.read_file(processed_file)
+    # Load existing processed data. GeoJSON inputs get a GeoParquet copy of
+    # their own (<stem>.svi_cache.parquet, distinct from the upstream
+    # stage's <stem>.parquet) so repeat runs skip the JSON parse while the
+    # GeoJSON is unchanged.
+    sidecar = str(Path(processed_file).with_suffix('.svi_cache.parquet'))
+    if (processed_file.endswith('.geojson') and os.path.exists(sidecar)
+            and os.path.getmtime(sidecar) >= os.path.getmtime(processed_file)):
+        gdf = gpd.read_parquet(sidecar)
+        print(f"  Using cached copy: {sidecar}")
+    else:
+        gdf = read_geodata(processed_file)
+        if processed_file.endswith('.geojson'):
+            gdf.to_parquet(sidecar, compression='zstd')
     print(f"  Loaded {len(gdf)} zip codes from existing data")
     
     # Ensure zip_code is string in both
@@ -154,25 +182,31 @@ def main():
     
     # Save standalone SVI metrics
     output_csv = 'data/processed/nyc_svi_metrics.csv'
-    metrics_df.to_csv(output_csv, index=False)
+    metrics_df.to_csv(output_csv, index=False, float_format='%.6g')  # float32 precision
     print(f"\n✓ Saved SVI metrics to {output_csv}")
     
     # Merge with existing processed data (prefer water data as it's most complete)
-    processed_files = [
-        'data/processed/nyc_zip_codes_with_water.geojson',
-        'data/processed/nyc_zip_codes_with_poultry.geojson',
-        'data/processed/nyc_zip_codes.geojson'
+    processed_stems = [
+        'nyc_zip_codes_with_water',
+        'nyc_zip_codes_with_poultry',
+        'nyc_zip_codes'
     ]
     
     merged_gdf = None
-    for processed_file in processed_files:
-        if os.path.exists(processed_file):
-            merged_gdf = merge_with_existing_data(metrics_df, processed_file)
+    for stem in processed_stems:
+        processed_file = find_processed_file(stem)
+        if processed_file is not None:
+            merged_gdf = merge_with_existing_data(metrics_df, str(processed_file))
             if merged_gdf is not None:
                 # Save merged data
-                output_file = processed_file.replace('.geojson', '_with_svi.geojson')
+                output_file = f'data/processed/{stem}_with_svi.geojson'
                 merged_gdf.to_file(output_file, driver='GeoJSON')
                 print(f"✓ Saved merged data to {output_file}")
+                
+                # GeoParquet copy for faster loading by the risk map scripts
+                output_parquet = output_file.replace('.geojson', '.parquet')
+                merged_gdf.to_parquet(output_parquet, compression='zstd')
+                print(f"✓ Saved merged data to {output_parquet}")
                 break
     
     if merged_gdf is None:
@@ -9,6 +9,8 @@ This script:
 
 import geopandas as gpd
 import pandas as pd
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 import sys
 import os
@@ -16,7 +18,12 @@ import os
 # Add src to path
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-from data_utils import calculate_water_proximity
+from data_utils import (
+    calculate_water_proximity,
+    find_processed_file,
+    project_geometry,
+    read_geodata
+)
 
 
 def load_nyc_water_data(file_path: str) -> gpd.GeoDataFrame:
@@ -31,22 +38,22 @@ def load_nyc_water_data(file_path: str) -> gpd.GeoDataFrame:
     print(f"Loading water data from {file_path}...")
     
     if file_path.endswith('.geojson'):
-        gdf = gpd.read_file(file_path)
+        gdf = gpd.read_file(file_path, engine='pyogrio', use_arrow=True)
     elif file_path.endswith('.shp'):
-        gdf = gpd.read_file(file_path)
+        gdf = gpd.read_file(file_path, engine='pyogrio', use_arrow=True)
     elif file_path.endswith('.gdb'):
         # For GDB, need to specify layer name
         # Common layer names: 'NHDFlowline', 'NHDWaterbody', 'NHDArea'
         try:
-            gdf = gpd.read_file(file_path, layer='NHDWaterbody')
+            gdf = gpd.read_file(file_path, layer='NHDWaterbody', engine='pyogrio', use_arrow=True)
         except:
             # Try other common layer names
             try:
-                gdf = gpd.read_file(file_path, layer='NHDArea')
+                gdf = gpd.read_file(file_path, layer='NHDArea', engine='pyogrio', use_arrow=True)
             except:
                 print("  Available layers:")
-                import fiona
-                print(fiona.listlayers(file_path))
+                import pyogrio
+                print(pyogrio.list_layers(file_path)[:, 0].tolist())
                 raise ValueError("Please specify the correct layer name")
     else:
         raise ValueError(f"Unsupported file format: {file_path}")
@@ -88,8 +95,13 @@ def process_water_proximity(
     return proximity
 
 
-def main():
-    """Main processing function."""
+def main(write_geojson: bool = False):
+    """
+    Main processing function.
+    
+    Writes GeoParquet for the rest of the pipeline; pass `write_geojson`
+    (or `--geojson` on the command line) to also export GeoJSON.
+    """
     print("=" * 60)
     print("Water Proximity Data Processing")
     print("=" * 60)
@@ -144,72 +156,79 @@ def main():
         print(f"  - {name}: {path}")
     
     # Load zip codes
-    zip_file = 'data/processed/nyc_zip_codes_with_poultry.geojson'
-    if not Path(zip_file).exists():
-        print(f"\nERROR: {zip_file} not found")
+    zip_file = find_processed_file('nyc_zip_codes_with_poultry')
+    if zip_file is None:
+        print("\nERROR: data/processed/nyc_zip_codes_with_poultry.parquet not found")
         print("  Please run: python src/process_poultry_raster.py first")
         return
     
     print(f"\nLoading zip codes from {zip_file}...")
-    zip_gdf = gpd.read_file(zip_file)
+    zip_gdf = read_geodata(zip_file)
     print(f"✓ Loaded {len(zip_gdf)} zip codes")
     
     # Load and combine water data from multiple sources
     print("\nLoading water data...")
-    water_geoms = []
     
-    # Load NHD water bodies (lakes, ponds, reservoirs)
-    if nhd_waterbody.exists():
-        print("  Loading NHDWaterbody (lakes, ponds, reservoirs)...")
-        waterbody = gpd.read_file(str(nhd_waterbody))
-        # Filter to NYC area for efficiency
-        nyc_bounds = zip_gdf.total_bounds
-        waterbody = waterbody.cx[
-            nyc_bounds[0]-0.1:nyc_bounds[2]+0.1,
-            nyc_bounds[1]-0.1:nyc_bounds[3]+0.1
-        ]
-        water_geoms.append(waterbody)
-        print(f"    Loaded {len(waterbody)} water bodies in NYC area")
+    # NHD layers: water bodies (lakes, ponds, reservoirs), flowlines
+    # (rivers, streams) and water areas
+    nhd_layers = [
+        (nhd_waterbody, 'NHDWaterbody (lakes, ponds, reservoirs)', 'water bodies'),
+        (nhd_flowline, 'NHDFlowline (rivers, streams)', 'rivers/streams'),
+        (nhd_area, 'NHDArea (water areas)', 'water areas')
+    ]
+    nhd_layers = [layer for layer in nhd_layers if layer[0].exists()]
     
-    # Load NHD flowlines (rivers, streams)
-    if nhd_flowline.exists():
-        print("  Loading NHDFlowline (rivers, streams)...")
-        flowline = gpd.read_file(str(nhd_flowline))
-        # Filter to NYC area
-        nyc_bounds = zip_gdf.total_bounds
-        flowline = flowline.cx[
-            nyc_bounds[0]-0.1:nyc_bounds[2]+0.1,
-            nyc_bounds[1]-0.1:nyc_bounds[3]+0.1
-        ]
-        water_geoms.append(flowline)
-        print(f"    Loaded {len(flowline)} rivers/streams in NYC area")
+    # The combined NHD features are cached as GeoParquet and reused while
+    # the cache is newer than the shapefiles and the zip code layer (whose
+    # bounds set the NYC filter)
+    water_cache = Path('data/processed/nyc_water_features.parquet')
+    source_files = [path for path, _, _ in nhd_layers] + [Path(zip_file)]
     
-    # Load NHD areas (water areas)
-    if nhd_area.exists():
-        print("  Loading NHDArea (water areas)...")
-        nhd_area_gdf = gpd.read_file(str(nhd_area))
-        # Filter to NYC area
+    if (nhd_layers and water_cache.exists()
+            and water_cache.stat().st_mtime > max(f.stat().st_mtime for f in source_files)):
+        water_gdf = project_geometry(gpd.read_parquet(water_cache), zip_gdf.crs)
+        print(f"✓ Loaded {len(water_gdf)} cached water features from {water_cache}")
+    elif nhd_layers:
+        # NYC bounds with a 0.1 degree margin, pushed into the reader so only
+        # NYC-area features are materialized (NHD is in NAD83 lon/lat, which
+        # matches the zip codes' WGS84 degrees closely enough for this filter)
         nyc_bounds = zip_gdf.total_bounds
-        nhd_area_gdf = nhd_area_gdf.cx[
-            nyc_bounds[0]-0.1:nyc_bounds[2]+0.1,
-            nyc_bounds[1]-0.1:nyc_bounds[3]+0.1
-        ]
-        water_geoms.append(nhd_area_gdf)
-        print(f"    Loaded {len(nhd_area_gdf)} water areas in NYC area")
-    
-    # Combine all water features
-    if water_geoms:
-        # Ensure all have same CRS
-        for i, gdf in enumerate(water_geoms):
-            if gdf.crs != zip_gdf.crs:
-                water_geoms[i] = gdf.to_crs(zip_gdf.crs)
+        water_bbox = (
+            nyc_bounds[0] - 0.1, nyc_bounds[1] - 0.1,
+            nyc_bounds[2] + 0.1, nyc_bounds[3] + 0.1
+        )
         
-        # Combine into single GeoDataFrame
-        water_gdf = gpd.GeoDataFrame(
-            pd.concat([gdf[['geometry']] for gdf in water_geoms], ignore_index=True),
-            crs=zip_gdf.crs
+        # Load the layers concurrently (pyogrio releases the GIL during reads)
+        water_geoms = []
+        with ThreadPoolExecutor(max_workers=len(nhd_layers)) as executor:
+            futures = [
+                executor.submit(
+                    gpd.read_file, str(path), bbox=water_bbox, engine='pyogrio', use_arrow=True
+                )
+                for path, _, _ in nhd_layers
+            ]
+            for (_, description, label), future in zip(nhd_layers, futures):
+                print(f"  Loading {description}...")
+                layer_gdf = future.result()
+                water_geoms.append(layer_gdf)
+                print(f"    Loaded {len(layer_gdf)} {label} in NYC area")
+        
+        # Combine the geometry arrays into a single GeoDataFrame (NHD layers
+        # normally share a CRS, so this reprojects once on the combined set)
+        water_crs = water_geoms[0].crs
+        geoms = np.concatenate([
+            np.asarray(project_geometry(gdf, water_crs).geometry.values)
+            for gdf in water_geoms
+        ])
+        water_gdf = project_geometry(
+            gpd.GeoDataFrame(geometry=gpd.GeoSeries(geoms, crs=water_crs)),
+            zip_gdf.crs
         )
         print(f"\n✓ Combined {len(water_gdf)} total water features")
+        
+        water_cache.parent.mkdir(parents=True, exist_ok=True)
+        water_gdf.to_parquet(water_cache)
+        print(f"  Cached water features to {water_cache}")
     else:
         # Fallback to other formats
         water_file = water_files[0][1]
@@ -229,10 +248,16 @@ def main():
     output_dir = Path('data/processed')
     output_dir.mkdir(parents=True, exist_ok=True)
     
-    output_file = output_dir / 'nyc_zip_codes_with_water.geojson'
-    zip_gdf.to_file(output_file, driver='GeoJSON')
+    output_file = output_dir / 'nyc_zip_codes_with_water.parquet'
+    zip_gdf.to_parquet(output_file, compression='zstd')
     print(f"✓ Saved to {output_file}")
     
+    # Optionally save as GeoJSON (e.g. for web maps)
+    if write_geojson:
+        output_geojson = output_dir / 'nyc_zip_codes_with_water.geojson'
+        zip_gdf.to_file(output_geojson, driver='GeoJSON', engine='pyogrio')
+        print(f"✓ Saved to {output_geojson}")
+    
     # Summary
     print("\n" + "=" * 60)
     print("Summary")
@@ -255,5 +280,5 @@ def main():
 
 
 if __name__ == '__main__':
-    main()
+    main(write_geojson='--geojson' in sys.argv)
 
@@ -12,8 +12,68 @@ import pandas as pd
 import numpy as np
 import geopandas as gpd
 from typing import Dict, List, Optional, Tuple, Union
-import warnings
-warnings.filterwarnings('ignore')
+
+# Risk factor columns combined into the composite score, in weight order
+RISK_FACTORS = [
+    'population_density',
+    'bird_density',
+    'water_proximity',
+    'healthcare_capacity',
+    'vulnerability_index'
+]
+
+# Risk score bin edges (right-closed) and their category labels
+RISK_CATEGORY_BINS = np.array([0, 0.25, 0.5, 0.75, 1.0])
+RISK_CATEGORIES = ['Low', 'Medium', 'High', 'Very High']
+
+# Equal-area CRS (NAD83 CONUS Albers) used when areas come from geometry
+AREA_CRS = 'EPSG:5070'
+
+# Below this many zip codes numba's JIT/thread start-up costs more than
+# a single BLAS matrix-vector product
+NUMBA_MIN_ROWS = 100_000
+
+try:
+    from numba import njit, prange
+    
+    @njit(parallel=True, fastmath=True, cache=True)
+    def weighted_sum_numba(X, w):
+        out = np.empty(X.shape[0], dtype=X.dtype)
+        for i in prange(X.shape[0]):
+            s = 0.0
+            for j in range(w.size):
+                s += X[i, j] * w[j]
+            out[i] = s
+        return out
+except ImportError:
+    weighted_sum_numba = None
+
+
+def weighted_sum(X: np.ndarray, w: np.ndarray) -> np.ndarray:
+    """
+    Row-wise weighted sum of a (n_zips, n_factors) array of risk factors.
+    
+    Uses a parallel numba kernel for large inputs when numba is installed,
+    otherwise a single matrix-vector product.
+    """
+    if weighted_sum_numba is not None and X.shape[0] >= NUMBA_MIN_ROWS:
+        return weighted_sum_numba(X, w)
+    return X @ w
+
+
+def categorize_risk(risk_scores: np.ndarray) -> pd.Categorical:
+    """
+    Bin risk scores into risk categories.
+    
+    Equivalent to `pd.cut` with right-closed bins over RISK_CATEGORY_BINS,
+    but looks the bins up with `np.searchsorted` and builds the categorical
+    from codes, skipping the IntervalIndex construction.
+    Scores outside (0, 1] (or NaN) get no category.
+    """
+    codes = np.searchsorted(RISK_CATEGORY_BINS, risk_scores, side='left') - 1
+    # Scores at or below 0 land at -1 already; above 1 and NaN land past the end
+    codes[codes >= len(RISK_CATEGORIES)] = -1
+    return pd.Categorical.from_codes(codes, RISK_CATEGORIES, ordered=True)
 
 
 class RiskMap:
@@ -87,7 +147,7 @@ class RiskMap:
         geometry_col: Optional[str] = None
     ) -> gpd.GeoDataFrame:
         """
-        Load zip code data from a file (CSV, GeoJSON, Shapefile, etc.).
+        Load zip code data from a file (GeoParquet, CSV, GeoJSON, Shapefile, etc.).
         
         Parameters
         ----------
@@ -103,7 +163,9 @@ class RiskMap:
         gpd.GeoDataFrame
             GeoDataFrame with zip code data
         """
-        if file_path.endswith('.geojson') or file_path.endswith('.shp'):
+        if file_path.endswith('.parquet'):
+            gdf = gpd.read_parquet(file_path)
+        elif file_path.endswith('.geojson') or file_path.endswith('.shp'):
             gdf = gpd.read_file(file_path)
         else:
             df = pd.read_csv(file_path)
@@ -118,6 +180,31 @@ class RiskMap:
         self.zip_code_data = gdf
         return gdf
     
+    def ensure_area(self, area_col: str = 'area_km2'):
+        """
+        Make sure the zip code data has an area column, computing it once.
+        
+        Areas are taken from an equal-area projection (EPSG:5070, NAD83
+        CONUS Albers) and stored on the data, so later calls are a column
+        lookup.
+        
+        Parameters
+        ----------
+        area_col : str
+            Name of the area column (in km²)
+        """
+        if area_col in self.zip_code_data.columns:
+            return
+        
+        # Try to calculate area from geometry if available
+        if not isinstance(self.zip_code_data, gpd.GeoDataFrame) or self.zip_code_data.geometry is None:
+            raise ValueError(f"Area column '{area_col}' not found and cannot calculate from geometry.")
+        
+        geometry = self.zip_code_data.geometry
+        if geometry.crs != AREA_CRS:
+            geometry = geometry.to_crs(AREA_CRS)
+        self.zip_code_data[area_col] = geometry.area / 1e6  # Convert m² to km²
+    
     def calculate_population_density(
         self,
         population_col: str = 'population',
@@ -141,14 +228,7 @@ class RiskMap:
         if self.zip_code_data is None:
             raise ValueError("No zip code data loaded. Use load_zip_code_data() first.")
         
-        if area_col not in self.zip_code_data.columns:
-            # Try to calculate area from geometry if available
-            if hasattr(self.zip_code_data, 'geometry') and self.zip_code_data.geometry is not None:
-                # Convert to appropriate CRS for area calculation (e.g., UTM)
-                gdf = self.zip_code_data.to_crs('EPSG:3857')  # Web Mercator
-                self.zip_code_data[area_col] = gdf.geometry.area / 1e6  # Convert m² to km²
-            else:
-                raise ValueError(f"Area column '{area_col}' not found and cannot calculate from geometry.")
+        self.ensure_area(area_col)
         
         density = self.zip_code_data[population_col] / self.zip_code_data[area_col]
         # Replace inf and NaN with 0
@@ -156,42 +236,59 @@ class RiskMap:
         
         return density
     
-    def normalize_risk_factor(self, series: pd.Series, method: str = 'min_max') -> pd.Series:
+    def normalize_risk_factor(
+        self,
+        series: Union[pd.Series, np.ndarray],
+        method: str = 'min_max'
+    ) -> Union[pd.Series, np.ndarray]:
         """
         Normalize a risk factor to 0-1 scale.
         
         Parameters
         ----------
-        series : pd.Series
-            Series to normalize
+        series : pd.Series or np.ndarray
+            Series to normalize, or a 2-D array with one risk factor per
+            column (each column is normalized on its own)
         method : str
             Normalization method: 'min_max' or 'z_score'
         
         Returns
         -------
-        pd.Series
-            Normalized series (0-1 scale)
+        pd.Series or np.ndarray
+            Normalized values (0-1 scale), of the same kind as `series`
         """
+        # Work on one float copy of the values and update it in place, as
+        # columns of a 2-D array (the NaN-skipping reductions still come
+        # from pandas)
+        dtype = series.dtype if series.dtype.kind == 'f' else np.float64
+        values = np.array(series, dtype=dtype, copy=True)
+        columns = values if values.ndim == 2 else values[:, np.newaxis]
+        stats = pd.DataFrame(columns, copy=False)
+        
         if method == 'min_max':
-            min_val = series.min()
-            max_val = series.max()
-            if max_val - min_val > 0:
-                normalized = (series - min_val) / (max_val - min_val)
-            else:
-                normalized = pd.Series(0, index=series.index)
+            min_val = stats.min().to_numpy()
+            value_range = stats.max().to_numpy() - min_val
+            varies = value_range > 0
+            np.subtract(columns, min_val, out=columns, where=varies)
+            np.divide(columns, value_range, out=columns, where=varies)
+            columns[:, ~varies] = 0
         elif method == 'z_score':
-            mean_val = series.mean()
-            std_val = series.std()
-            if std_val > 0:
-                normalized = (series - mean_val) / std_val
-                # Convert z-scores to 0-1 scale using sigmoid
-                normalized = 1 / (1 + np.exp(-normalized))
-            else:
-                normalized = pd.Series(0.5, index=series.index)
+            std_val = stats.std().to_numpy()
+            varies = std_val > 0
+            np.subtract(columns, stats.mean().to_numpy(), out=columns, where=varies)
+            np.divide(columns, -std_val, out=columns, where=varies)
+            # Convert z-scores to 0-1 scale using sigmoid
+            np.exp(columns, out=columns, where=varies)
+            np.add(columns, 1, out=columns, where=varies)
+            np.reciprocal(columns, out=columns, where=varies)
+            columns[:, ~varies] = 0.5
         else:
             raise ValueError(f"Unknown normalization method: {method}")
         
-        return normalized.fillna(0)
+        values[np.isnan(values)] = 0
+        if isinstance(series, pd.Series):
+            return pd.Series(values, index=series.index, name=series.name)
+        return values
     
     def calculate_risk_scores(
         self,
@@ -228,72 +325,62 @@ class RiskMap:
         if self.zip_code_data is None:
             raise ValueError("No zip code data loaded. Use load_zip_code_data() first.")
         
-        results = pd.DataFrame(index=self.zip_code_data.index)
-        
         # Calculate population density
         pop_density = self.calculate_population_density(population_col, area_col)
-        results['population_density'] = pop_density
-        results['population_density_norm'] = self.normalize_risk_factor(pop_density)
-        
-        # Bird density (if available)
-        if bird_density_col and bird_density_col in self.zip_code_data.columns:
-            bird_density = self.zip_code_data[bird_density_col].fillna(0)
-            results['bird_density'] = bird_density
-            results['bird_density_norm'] = self.normalize_risk_factor(bird_density)
-        else:
-            results['bird_density_norm'] = 0
-        
-        # Water proximity (if available)
-        if water_proximity_col and water_proximity_col in self.zip_code_data.columns:
-            water_prox = self.zip_code_data[water_proximity_col].fillna(0)
-            results['water_proximity'] = water_prox
-            results['water_proximity_norm'] = self.normalize_risk_factor(water_prox)
-        else:
-            results['water_proximity_norm'] = 0
-        
-        # Healthcare capacity (if available) - lower capacity = higher risk
-        if healthcare_col and healthcare_col in self.zip_code_data.columns:
-            healthcare = self.zip_code_data[healthcare_col].fillna(0)
-            results['healthcare_capacity'] = healthcare
-            # Invert: lower capacity = higher risk
-            healthcare_norm = self.normalize_risk_factor(healthcare)
-            results['healthcare_capacity_norm'] = 1 - healthcare_norm
-        else:
-            results['healthcare_capacity_norm'] = 0
-        
-        # Vulnerability index (if available)
-        if vulnerability_col and vulnerability_col in self.zip_code_data.columns:
-            vulnerability = self.zip_code_data[vulnerability_col].fillna(0)
-            results['vulnerability_index'] = vulnerability
-            results['vulnerability_index_norm'] = self.normalize_risk_factor(vulnerability)
-        else:
-            results['vulnerability_index_norm'] = 0
-        
-        # Calculate composite risk score
-        risk_score = (
-            results['population_density_norm'] * self.risk_weights.get('population_density', 0) +
-            results['bird_density_norm'] * self.risk_weights.get('bird_density', 0) +
-            results['water_proximity_norm'] * self.risk_weights.get('water_proximity', 0) +
-            results['healthcare_capacity_norm'] * self.risk_weights.get('healthcare_capacity', 0) +
-            results['vulnerability_index_norm'] * self.risk_weights.get('vulnerability_index', 0)
-        )
         
+        # Raw risk factors (if available), keyed in RISK_FACTORS order
+        factor_cols = {
+            'bird_density': bird_density_col,
+            'water_proximity': water_proximity_col,
+            'healthcare_capacity': healthcare_col,
+            'vulnerability_index': vulnerability_col
+        }
+        raw = {'population_density': pop_density}
+        for factor, col in factor_cols.items():
+            if col and col in self.zip_code_data.columns:
+                raw[factor] = self.zip_code_data[col].fillna(0)
+        
+        # Normalize all available factors in one pass over a 2-D array;
+        # missing factors keep a normalized value of 0
+        present = [RISK_FACTORS.index(factor) for factor in raw]
+        values = np.column_stack([series.to_numpy(dtype=np.float64) for series in raw.values()])
+        
+        # The normalized factors and the score are kept in float32, plenty
+        # for 0-1 quantities and half the memory traffic of float64
+        factors = np.zeros((len(pop_density), len(RISK_FACTORS)), dtype=np.float32)
+        factors[:, present] = self.normalize_risk_factor(values)
+        
+        # Healthcare capacity - lower capacity = higher risk
+        if 'healthcare_capacity' in raw:
+            factors[:, RISK_FACTORS.index('healthcare_capacity')] *= -1
+            factors[:, RISK_FACTORS.index('healthcare_capacity')] += 1
+        
+        columns = {}
+        for j, factor in enumerate(RISK_FACTORS):
+            if factor in raw:
+                columns[factor] = raw[factor]
+            columns[f'{factor}_norm'] = factors[:, j]
+        results = pd.DataFrame(columns, index=self.zip_code_data.index)
+        
+        # Calculate composite risk score as one weighted sum over the
+        # normalized factor columns
+        weights = np.array([self.risk_weights.get(factor, 0) for factor in RISK_FACTORS], dtype=np.float32)
+        
+        risk_score = weighted_sum(factors, weights)
+        # float32 rounding can push a maximal score just above 1
+        np.minimum(risk_score, 1, out=risk_score)
         results['risk_score'] = risk_score
-        results['risk_category'] = pd.cut(
-            risk_score,
-            bins=[0, 0.25, 0.5, 0.75, 1.0],
-            labels=['Low', 'Medium', 'High', 'Very High']
-        )
+        results['risk_category'] = categorize_risk(results['risk_score'].to_numpy())
         
         self.risk_scores = results
         
-        # Create GeoDataFrame with risk scores
-        if isinstance(self.zip_code_data, gpd.GeoDataFrame):
-            self.risk_map_gdf = gpd.GeoDataFrame(
-                pd.concat([self.zip_code_data, results], axis=1)
-            )
-        else:
-            self.risk_map_gdf = pd.concat([self.zip_code_data, results], axis=1)
+        # Create (Geo)DataFrame with risk scores: a shallow copy of the input
+        # with the result columns added, so the input columns (including
+        # geometry) are not copied. Result columns replace input columns of
+        # the same name.
+        self.risk_map_gdf = self.zip_code_data.copy(deep=False)
+        for col in results.columns:
+            self.risk_map_gdf[col] = results[col].values
         
         return results
     
@@ -385,6 +472,7 @@ class RiskMap:
             The folium map object
         """
         try:
+            import branca.colormap
             import folium
             from folium import plugins
         except ImportError:
@@ -396,8 +484,15 @@ class RiskMap:
         if not isinstance(self.risk_map_gdf, gpd.GeoDataFrame):
             raise ValueError("GeoDataFrame required for interactive map. Ensure geometry data is loaded.")
         
+        # Default popup columns
+        if popup_cols is None:
+            popup_cols = ['zip_code', 'risk_score', 'risk_category', 'population']
+        popup_cols = [col for col in popup_cols if col in self.risk_map_gdf.columns]
+        
+        # Only the displayed columns are serialized into the map.
         # Ensure CRS is WGS84 for folium
-        gdf = self.risk_map_gdf.to_crs('EPSG:4326')
+        map_cols = popup_cols + [risk_col] if risk_col not in popup_cols else popup_cols
+        gdf = self.risk_map_gdf[map_cols + ['geometry']].to_crs('EPSG:4326')
         
         # Calculate center of the map
         bounds = gdf.total_bounds
@@ -411,38 +506,34 @@ class RiskMap:
             tiles='OpenStreetMap'
         )
         
-        # Default popup columns
-        if popup_cols is None:
-            popup_cols = ['zip_code', 'risk_score', 'risk_category', 'population']
-            popup_cols = [col for col in popup_cols if col in gdf.columns]
-        
-        # Add choropleth layer
-        folium.Choropleth(
-            geo_data=gdf,
-            data=gdf,
-            columns=['zip_code', risk_col],
-            key_on='feature.properties.zip_code',
-            fill_color='YlOrRd',
-            fill_opacity=0.7,
-            line_opacity=0.2,
-            legend_name='H5N1 Risk Score',
-            highlight=True
-        ).add_to(m)
+        # Color scale for the risk scores, also shown as the map legend
+        colormap = branca.colormap.linear.YlOrRd_09.scale(
+            gdf[risk_col].min(), gdf[risk_col].max()
+        )
+        colormap.caption = 'H5N1 Risk Score'
+        
+        def style_function(feature):
+            value = feature['properties'][risk_col]
+            return {
+                'fillColor': 'lightgray' if pd.isna(value) else colormap(value),
+                'color': 'black',
+                'weight': 0.5,
+                'fillOpacity': 0.7
+            }
         
-        # Add popup information
-        for idx, row in gdf.iterrows():
-            popup_text = '<br>'.join([f'<b>{col}:</b> {row[col]}' for col in popup_cols if col in row])
-            
-            folium.GeoJson(
-                row.geometry,
-                style_function=lambda feature: {
-                    'fillColor': 'transparent',
-                    'color': 'black',
-                    'weight': 1,
-                    'fillOpacity': 0
-                },
-                tooltip=folium.Tooltip(popup_text, sticky=True)
-            ).add_to(m)
+        # Add the risk layer as a single GeoJson layer, styled from each
+        # feature's risk score, with a tooltip per feature
+        folium.GeoJson(
+            gdf,
+            style_function=style_function,
+            highlight_function=lambda feature: {'weight': 3, 'fillOpacity': 0.9},
+            tooltip=folium.GeoJsonTooltip(
+                fields=popup_cols,
+                aliases=[f'{col}:' for col in popup_cols],
+                sticky=True
+            )
+        ).add_to(m)
+        colormap.add_to(m)
         
         # Save map
         m.save(output_path)
@@ -477,12 +568,12 @@ class RiskMap:
             df.to_csv(output_path, index=False)
         elif format == 'geojson':
             if isinstance(self.risk_map_gdf, gpd.GeoDataFrame):
-                self.risk_map_gdf.to_file(output_path, driver='GeoJSON')
+                self.risk_map_gdf.to_file(output_path, driver='GeoJSON', engine='pyogrio')
             else:
                 raise ValueError("GeoDataFrame required for GeoJSON export.")
         elif format == 'shp':
             if isinstance(self.risk_map_gdf, gpd.GeoDataFrame):
-                self.risk_map_gdf.to_file(output_path, driver='ESRI Shapefile')
+                self.risk_map_gdf.to_file(output_path, driver='ESRI Shapefile', engine='pyogrio')
             else:
                 raise ValueError("GeoDataFrame required for Shapefile export.")
         else:
@@ -513,11 +604,25 @@ class RiskMap:
         if self.risk_scores is None:
             raise ValueError("Risk scores not calculated. Use calculate_risk_scores() first.")
         
-        high_risk = self.risk_scores[self.risk_scores['risk_score'] >= threshold]
+        scores = self.risk_scores['risk_score'].to_numpy()
         
         if top_n:
-            high_risk = self.risk_scores.nlargest(top_n, 'risk_score')
-        
+            # Find the Nth largest score in O(n), then sort only the rows
+            # at or above it; the stable sort over rows in their original
+            # order keeps the earliest of tied rows, as nlargest does
+            valid = np.flatnonzero(~np.isnan(scores))
+            if top_n < len(valid):
+                cutoff = np.partition(scores[valid], len(valid) - top_n)[len(valid) - top_n]
+                candidates = valid[scores[valid] >= cutoff]
+            else:
+                candidates = valid
+            top = candidates[np.argsort(-scores[candidates], kind='stable')][:top_n]
+            if top_n > len(valid):
+                # Like nlargest, fill up with unscored rows, placed last
+                top = np.concatenate([top, np.flatnonzero(np.isnan(scores))[:top_n - len(valid)]])
+            return self.risk_scores.iloc[top]
+        
+        high_risk = self.risk_scores[scores >= threshold]
         return high_risk.sort_values('risk_score', ascending=False)
 
 
@@ -535,16 +640,20 @@ def create_sample_data(n_zips: int = 50) -> pd.DataFrame:
     pd.DataFrame
         Sample DataFrame with zip code data
     """
-    np.random.seed(42)
+    rng = np.random.default_rng(42)
+    
+    # '1000' followed by the index, zero-padded to two digits
+    index = np.arange(n_zips)
+    zip_codes = np.char.add(np.where(index < 10, '10000', '1000'), index.astype(str))
     
     data = {
-        'zip_code': [f'1000{i:02d}' for i in range(n_zips)],
-        'population': np.random.randint(1000, 50000, n_zips),
-        'area_km2': np.random.uniform(0.5, 10.0, n_zips),
-        'bird_density': np.random.uniform(0, 100, n_zips),
-        'water_proximity': np.random.uniform(0, 1, n_zips),
-        'healthcare_capacity': np.random.uniform(0, 1, n_zips),
-        'vulnerability_index': np.random.uniform(0, 1, n_zips)
+        'zip_code': zip_codes,
+        'population': rng.integers(1000, 50000, n_zips),
+        'area_km2': rng.uniform(0.5, 10.0, n_zips),
+        'bird_density': rng.uniform(0, 100, n_zips),
+        'water_proximity': rng.uniform(0, 1, n_zips),
+        'healthcare_capacity': rng.uniform(0, 1, n_zips),
+        'vulnerability_index': rng.uniform(0, 1, n_zips)
     }
     
     return pd.DataFrame(data)
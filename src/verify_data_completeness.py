@@ -4,41 +4,146 @@ Verify data completeness for H5N1 risk mapping.
 Checks all required data files and reports status.
 """
 
+import functools
+import json
 import os
 import sys
 import pandas as pd
 import geopandas as gpd
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 # Add src to path
-sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from data_utils import file_info
+
+# Results of parsing data files, reused while a file's size and
+# modification time are unchanged. Only written with --write-manifest, so
+# a plain check leaves the data directory untouched.
+MANIFEST_FILE = Path('data/processed/.data_manifest.json')
+
+# Block size for counting lines in data files
+COUNT_BLOCK_SIZE = 1024 * 1024
+
+# file_info results by absolute path for one check pass (cleared by
+# check_all_data)
+FILE_INFO_CACHE = {}
+
+@functools.lru_cache(maxsize=None)
+def list_directory(directory):
+    """
+    Return the entry names of a directory (empty if it does not exist).
+    
+    Listings are cached for one check pass; check_all_data clears them.
+    """
+    try:
+        with os.scandir(directory) as entries:
+            return frozenset(entry.name for entry in entries)
+    except (FileNotFoundError, NotADirectoryError):
+        return frozenset()
+
+def stat_file(path):
+    """
+    Return (exists, size in bytes, mtime in ns) for a path.
+    
+    Missing files are answered from one cached scan of their directory
+    without a stat call of their own; present files are stat'ed once per
+    check pass through FILE_INFO_CACHE.
+    """
+    directory, name = os.path.split(os.path.abspath(path))
+    if name not in list_directory(directory):
+        return False, 0, 0
+    return file_info(os.path.join(directory, name), FILE_INFO_CACHE)
+
+@functools.lru_cache(maxsize=None)
+def load_manifest():
+    """Load the manifest of parsed file results (empty if missing or unreadable)."""
+    try:
+        with open(MANIFEST_FILE) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def save_manifest(manifest):
+    """Write the manifest of parsed file results, if the directory is writable."""
+    try:
+        MANIFEST_FILE.parent.mkdir(parents=True, exist_ok=True)
+        with open(MANIFEST_FILE, 'w') as f:
+            json.dump(manifest, f, indent=2)
+    except OSError:
+        pass
+    load_manifest.cache_clear()
+
+def count_lines(filepath):
+    """Count the lines in a file, including a last line with no newline."""
+    lines = 0
+    last = b'\n'
+    with open(filepath, 'rb') as f:
+        for block in iter(functools.partial(f.read, COUNT_BLOCK_SIZE), b''):
+            lines += block.count(b'\n')
+            last = block[-1:]
+    return lines + (last != b'\n')
+
+def probe_csv(filepath, write_manifest=False):
+    """
+    Return the header columns and data row count of a CSV file.
+    
+    Reuses the manifest entry (from a saved manifest or an earlier call in
+    this process) while the file is unchanged; otherwise parses the
+    header and counts raw lines. New results are saved to MANIFEST_FILE
+    only if `write_manifest` is set.
+    """
+    # Stat afresh rather than through the stat_file cache, so a file that
+    # changes between calls in one process is parsed again
+    st = os.stat(filepath)
+    size, mtime_ns = st.st_size, st.st_mtime_ns
+    manifest = load_manifest()
+    entry = manifest.get(filepath)
+    if entry and entry['size'] == size and entry['mtime_ns'] == mtime_ns:
+        return entry['columns'], entry['total_rows']
+    
+    # Parse only the header; rows are counted from newline bytes in
+    # large blocks rather than by parsing the whole file
+    columns = list(pd.read_csv(filepath, nrows=0).columns)
+    total_rows = count_lines(filepath) - 1
+    
+    manifest[filepath] = {
+        'size': size,
+        'mtime_ns': mtime_ns,
+        'columns': columns,
+        'total_rows': total_rows
+    }
+    if write_manifest:
+        save_manifest(manifest)
+    return columns, total_rows
 
 def check_file_exists(filepath, description):
     """Check if a file exists and return status."""
-    exists = os.path.exists(filepath)
-    size = os.path.getsize(filepath) if exists else 0
+    exists, size, _ = stat_file(filepath)
     return {
         'exists': exists,
         'size_mb': round(size / (1024 * 1024), 2) if exists else 0,
         'description': description
     }
 
-def check_svi_data():
+def check_svi_data(write_manifest=False):
     """Check SVI (Social Vulnerability Index) data."""
     results = {}
     
     # Check NewYork_ZCTA.csv (NY-specific SVI)
     ny_file = 'data/raw/NewYork_ZCTA.csv'
-    if os.path.exists(ny_file):
+    if stat_file(ny_file)[0]:
         try:
-            df = pd.read_csv(ny_file, nrows=1)
+            header, total_rows = probe_csv(ny_file, write_manifest)
+            columns = set(header)
             results['ny_svi'] = {
                 'exists': True,
-                'has_rpl_themes': 'RPL_THEMES' in df.columns,
-                'has_fips': 'FIPS' in df.columns,
-                'has_rpl_theme1': 'RPL_THEME1' in df.columns,
-                'columns': list(df.columns)[:10],
-                'total_rows': len(pd.read_csv(ny_file))
+                'has_rpl_themes': 'RPL_THEMES' in columns,
+                'has_fips': 'FIPS' in columns,
+                'has_rpl_theme1': 'RPL_THEME1' in columns,
+                'columns': header[:10],
+                'total_rows': total_rows
             }
         except Exception as e:
             results['ny_svi'] = {'exists': True, 'error': str(e)}
@@ -47,13 +152,13 @@ def check_svi_data():
     
     # Check national SVI file
     nat_file = 'data/raw/svi_interactive_map.csv'
-    if os.path.exists(nat_file):
+    if stat_file(nat_file)[0]:
         try:
-            df = pd.read_csv(nat_file, nrows=1)
+            columns = set(pd.read_csv(nat_file, nrows=0).columns)
             results['national_svi'] = {
                 'exists': True,
-                'has_rpl_themes': 'RPL_THEMES' in df.columns,
-                'has_fips': 'FIPS' in df.columns
+                'has_rpl_themes': 'RPL_THEMES' in columns,
+                'has_fips': 'FIPS' in columns
             }
         except Exception as e:
             results['national_svi'] = {'exists': True, 'error': str(e)}
@@ -73,29 +178,47 @@ def check_healthcare_data():
         ('data/raw/nyc_hospitals.shp', 'Shapefile')
     ]
     
-    found = False
-    for filepath, filetype in hospital_files:
-        if os.path.exists(filepath):
-            results['hospitals'] = {
-                'exists': True,
-                'filetype': filetype,
-                'filepath': filepath
-            }
-            found = True
-            break
-    
-    if not found:
+    # First hospital file that exists, if any
+    hit = next(
+        ((filepath, filetype) for filepath, filetype in hospital_files if stat_file(filepath)[0]),
+        None
+    )
+    if hit:
+        filepath, filetype = hit
+        results['hospitals'] = {
+            'exists': True,
+            'filetype': filetype,
+            'filepath': filepath
+        }
+    else:
         results['hospitals'] = {'exists': False}
     
     return results
 
-def check_all_data():
-    """Comprehensive data check."""
+def check_all_data(write_manifest=False):
+    """
+    Comprehensive data check.
+    
+    Pass `write_manifest` (or `--write-manifest` on the command line) to
+    save parsed file results to MANIFEST_FILE for later runs.
+    """
     print("=" * 70)
     print("H5N1 Risk Mapping - Data Completeness Check")
     print("=" * 70)
     print()
     
+    # Start from fresh directory listings and file stats, so files added
+    # or changed since an earlier check in this process are seen
+    list_directory.cache_clear()
+    FILE_INFO_CACHE.clear()
+    
+    # The healthcare and SVI checks (the latter reads the SVI CSV) are
+    # independent of the file listing below, so run them in the background
+    executor = ThreadPoolExecutor(max_workers=2)
+    hc_future = executor.submit(check_healthcare_data)
+    svi_future = executor.submit(check_svi_data, write_manifest)
+    executor.shutdown(wait=False)
+    
     # Priority 1: Essential
     print("📋 PRIORITY 1: Essential Data")
     print("-" * 70)
@@ -103,6 +226,7 @@ def check_all_data():
     # Zip code boundaries
     zip_files = [
         ('data/raw/Modified_Zip_Code_Tabulation_Areas_(MODZCTA)_20251205.csv', 'MODZCTA CSV'),
+        ('data/processed/nyc_zip_codes.parquet', 'Processed GeoParquet'),
         ('data/processed/nyc_zip_codes.geojson', 'Processed GeoJSON')
     ]
     zip_found = False
@@ -117,6 +241,7 @@ def check_all_data():
     # Population data
     pop_files = [
         ('data/raw/DECENNIALDHC2020.P1-Data.csv', 'Census 2020'),
+        ('data/processed/nyc_zip_codes.parquet', 'Processed (includes population)'),
         ('data/processed/nyc_zip_codes.geojson', 'Processed (includes population)')
     ]
     pop_found = False
@@ -137,6 +262,7 @@ def check_all_data():
     # Poultry data
     poultry_files = [
         ('data/raw/Poultry.tif', 'USGS Poultry Raster'),
+        ('data/processed/nyc_zip_codes_with_poultry.parquet', 'Processed with poultry'),
         ('data/processed/nyc_zip_codes_with_poultry.geojson', 'Processed with poultry')
     ]
     poultry_found = False
@@ -152,6 +278,7 @@ def check_all_data():
     water_files = [
         ('data/raw/Shape/NHDWaterbody.shp', 'NHD Waterbody'),
         ('data/raw/Shape/NHDFlowline.shp', 'NHD Flowline'),
+        ('data/processed/nyc_zip_codes_with_water.parquet', 'Processed with water'),
         ('data/processed/nyc_zip_codes_with_water.geojson', 'Processed with water')
     ]
     water_found = False
@@ -170,14 +297,14 @@ def check_all_data():
     print("-" * 70)
     
     # Healthcare data
-    hc_results = check_healthcare_data()
+    hc_results = hc_future.result()
     if hc_results.get('hospitals', {}).get('exists'):
         print(f"  ✅ Healthcare data: {hc_results['hospitals']['filepath']}")
     else:
         print("  ⚠️  Healthcare data: NOT FOUND (using defaults)")
     
     # Vulnerability data (SVI)
-    svi_results = check_svi_data()
+    svi_results = svi_future.result()
     if svi_results.get('ny_svi', {}).get('exists'):
         ny_svi = svi_results['ny_svi']
         print(f"  ✅ SVI data (NY): data/raw/NewYork_ZCTA.csv")
@@ -247,5 +374,5 @@ def check_all_data():
     }
 
 if __name__ == '__main__':
-    check_all_data()
+    check_all_data(write_manifest='--write-manifest' in sys.argv)
 
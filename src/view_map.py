@@ -4,10 +4,11 @@ Simple script to view the interactive risk map in a web browser.
 Opens the HTML file using Python's built-in HTTP server if needed.
 """
 
+import functools
 import os
 import sys
 import webbrowser
-from http.server import HTTPServer, SimpleHTTPRequestHandler
+from http.server import ThreadingHTTPServer, SimpleHTTPRequestHandler
 from pathlib import Path
 
 def open_map_direct(file_path):
@@ -34,18 +35,21 @@ def serve_map_http(file_path, port=8000):
         print(f"ERROR: File not found: {file_path}")
         return False
     
-    # Change to the directory containing the file
-    os.chdir(file_dir)
-    
     # Create a custom handler that serves the specific file
     class MapHandler(SimpleHTTPRequestHandler):
+        # Keep connections open between requests
+        protocol_version = 'HTTP/1.1'
+        
         def do_GET(self):
             if self.path == '/' or self.path == f'/{file_name}':
                 self.path = f'/{file_name}'
             return SimpleHTTPRequestHandler.do_GET(self)
     
+    # Serve from the directory containing the file, without changing the
+    # process's working directory
+    handler = functools.partial(MapHandler, directory=file_dir)
     server_address = ('', port)
-    httpd = HTTPServer(server_address, MapHandler)
+    httpd = ThreadingHTTPServer(server_address, handler)
     
     url = f'http://localhost:{port}/{file_name}'
     print(f"\n{'='*60}")
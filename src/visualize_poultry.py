@@ -8,57 +8,117 @@ This script creates maps showing:
 """
 
 import geopandas as gpd
+import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
+import shapely
+from matplotlib.collections import PathCollection
+from matplotlib.path import Path as MplPath
 import sys
 import os
-from pathlib import Path
 
 # Add src to path
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
+from data_utils import find_processed_file, read_geodata
 
-def create_poultry_susceptibility_map(
-    data_file: str = 'data/processed/nyc_zip_codes_with_poultry.geojson',
-    output_path: str = 'data/processed/poultry_susceptibility_map.png'
-):
+# Tolerance (degrees, ~50 m at NYC) for simplifying zip code outlines
+# before drawing them; far below what either map can show
+SIMPLIFY_TOLERANCE = 0.0005
+
+
+def polygon_paths(geoms) -> list:
     """
-    Create a map showing poultry susceptibility by zip code.
+    Convert (multi)polygons to one matplotlib Path per geometry.
+    
+    All coordinates are pulled out in one ragged-array conversion and the
+    path codes are set per ring with array operations, instead of
+    building a patch per polygon part.
     """
-    print("Creating poultry susceptibility map...")
+    _, coords, offsets = shapely.to_ragged_array(np.asarray(geoms))
+    ring_offsets = offsets[0]
     
-    if not Path(data_file).exists():
-        print(f"ERROR: {data_file} not found")
-        return
+    # Each ring starts with MOVETO and ends with CLOSEPOLY
+    codes = np.full(len(coords), MplPath.LINETO, dtype=MplPath.code_type)
+    codes[ring_offsets[:-1]] = MplPath.MOVETO
+    codes[ring_offsets[1:] - 1] = MplPath.CLOSEPOLY
+    
+    # Map each geometry to its span of vertices through the nested
+    # polygon/multipolygon offsets
+    bounds = ring_offsets
+    for geom_offsets in offsets[1:]:
+        bounds = bounds[geom_offsets]
+    
+    return [
+        MplPath(coords[start:end], codes[start:end])
+        for start, end in zip(bounds[:-1], bounds[1:])
+    ]
+
+
+def load_poultry_data(data_file: str = None) -> gpd.GeoDataFrame:
+    """
+    Load the zip codes with poultry data, ready for mapping.
+    
+    The geometry is projected to EPSG:4326 and simplified. Returns None
+    if the data file is missing.
+    """
+    if data_file is None:
+        data_file = find_processed_file('nyc_zip_codes_with_poultry')
+    if data_file is None or not os.path.exists(data_file):
+        print(f"ERROR: {data_file or 'nyc_zip_codes_with_poultry.parquet'} not found")
+        return None
     
     # Load data
-    gdf = gpd.read_file(data_file)
+    gdf = read_geodata(data_file)
     
     # Ensure CRS is appropriate for NYC
     if gdf.crs != 'EPSG:4326':
         gdf = gdf.to_crs('EPSG:4326')
+    gdf['geometry'] = gdf.geometry.simplify(SIMPLIFY_TOLERANCE, preserve_topology=True)
+    
+    return gdf
+
+
+def create_poultry_susceptibility_map(
+    data_file: str = None,
+    output_path: str = 'data/processed/poultry_susceptibility_map.png',
+    gdf: gpd.GeoDataFrame = None
+):
+    """
+    Create a map showing poultry susceptibility by zip code.
+    
+    Pass `gdf` (from `load_poultry_data`) to reuse already loaded data.
+    """
+    print("Creating poultry susceptibility map...")
+    
+    if gdf is None:
+        gdf = load_poultry_data(data_file)
+        if gdf is None:
+            return
     
     # Create figure
-    fig, ax = plt.subplots(figsize=(14, 10))
+    fig, ax = plt.subplots(figsize=(10, 7))
     
-    # Plot poultry susceptibility
-    gdf.plot(
-        column='poultry_susceptibility',
-        cmap='Reds',
-        legend=True,
-        ax=ax,
+    # Plot poultry susceptibility as a single collection of zip code paths
+    # (zip codes without data are drawn in light gray)
+    collection = PathCollection(
+        polygon_paths(gdf.geometry.values),
+        array=gdf['poultry_susceptibility'].to_numpy(dtype=float),
+        cmap=plt.get_cmap('Reds').with_extremes(bad='lightgray'),
         edgecolor='black',
-        linewidth=0.3,
-        legend_kwds={
-            'label': 'Poultry Susceptibility Score',
-            'shrink': 0.8,
-            'orientation': 'horizontal',
-            'pad': 0.02
-        },
-        missing_kwds={
-            'color': 'lightgray',
-            'label': 'No data'
-        }
+        linewidth=0.3
+    )
+    ax.add_collection(collection)
+    ax.autoscale_view()
+    # Same aspect as geopandas uses for geographic coordinates
+    ax.set_aspect(1 / np.cos(np.deg2rad(gdf.total_bounds[[1, 3]].mean())))
+    fig.colorbar(
+        collection,
+        ax=ax,
+        label='Poultry Susceptibility Score',
+        shrink=0.8,
+        orientation='horizontal',
+        pad=0.02
     )
     
     ax.set_title(
@@ -72,10 +132,12 @@ def create_poultry_susceptibility_map(
     ax.set_axis_off()
     
     # Add text annotation
+    poultry = gdf['poultry_susceptibility']
+    stats = poultry.agg(['min', 'max', 'mean'])
     stats_text = (
-        f"Zip codes with data: {(gdf['poultry_susceptibility'] > 0).sum()}/{len(gdf)}\n"
-        f"Range: {gdf['poultry_susceptibility'].min():.0f} - {gdf['poultry_susceptibility'].max():.0f}\n"
-        f"Mean: {gdf['poultry_susceptibility'].mean():.0f}"
+        f"Zip codes with data: {(poultry > 0).sum()}/{len(gdf)}\n"
+        f"Range: {stats['min']:.0f} - {stats['max']:.0f}\n"
+        f"Mean: {stats['mean']:.0f}"
     )
     ax.text(
         0.02, 0.98, stats_text,
@@ -85,14 +147,20 @@ def create_poultry_susceptibility_map(
         bbox=dict(boxstyle='round', facecolor='wheat', alpha=0.8)
     )
     
-    plt.tight_layout()
-    plt.savefig(output_path, dpi=300, bbox_inches='tight')
+    # The layout is fixed up front, so the figure is rendered once (no
+    # bbox_inches='tight' pass); 150 dpi is plenty for a preview map
+    fig.tight_layout()
+    plt.savefig(
+        output_path,
+        dpi=150,
+        pil_kwargs={'optimize': True, 'compress_level': 6}
+    )
     print(f"✓ Saved to {output_path}")
     plt.close()
 
 
 def create_risk_comparison_map(
-    risk_file: str = 'data/processed/nyc_zip_codes_with_poultry.geojson',
+    risk_file: str = 'data/processed/nyc_zip_codes_with_poultry.parquet',
     output_path: str = 'data/processed/risk_comparison_map.png'
 ):
     """
@@ -106,13 +174,17 @@ def create_risk_comparison_map(
 
 
 def create_interactive_poultry_map(
-    data_file: str = 'data/processed/nyc_zip_codes_with_poultry.geojson',
-    output_path: str = 'data/processed/poultry_susceptibility_map.html'
+    data_file: str = None,
+    output_path: str = 'data/processed/poultry_susceptibility_map.html',
+    gdf: gpd.GeoDataFrame = None
 ):
     """
     Create an interactive Folium map of poultry susceptibility.
+    
+    Pass `gdf` (from `load_poultry_data`) to reuse already loaded data.
     """
     try:
+        import branca.colormap
         import folium
     except ImportError:
         print("  folium not available, skipping interactive map")
@@ -120,13 +192,10 @@ def create_interactive_poultry_map(
     
     print("Creating interactive poultry susceptibility map...")
     
-    if not Path(data_file).exists():
-        print(f"ERROR: {data_file} not found")
-        return
-    
-    # Load data
-    gdf = gpd.read_file(data_file)
-    gdf = gdf.to_crs('EPSG:4326')
+    if gdf is None:
+        gdf = load_poultry_data(data_file)
+        if gdf is None:
+            return
     
     # Calculate center
     bounds = gdf.total_bounds
@@ -140,37 +209,48 @@ def create_interactive_poultry_map(
         tiles='OpenStreetMap'
     )
     
-    # Add choropleth
-    folium.Choropleth(
-        geo_data=gdf,
-        data=gdf,
-        columns=['zip_code', 'poultry_susceptibility'],
-        key_on='feature.properties.zip_code',
-        fill_color='Reds',
-        fill_opacity=0.7,
-        line_opacity=0.2,
-        legend_name='Poultry Susceptibility Score',
-        highlight=True
-    ).add_to(m)
+    # Map data: the score for styling plus tooltip values, formatted once
+    # per column rather than per feature
+    map_gdf = gpd.GeoDataFrame({
+        'zip_code': gdf['zip_code'],
+        'poultry_susceptibility': gdf['poultry_susceptibility'],
+        'poultry_fmt': gdf['poultry_susceptibility'].map('{:.0f}'.format)
+    }, geometry=gdf.geometry)
+    tooltip_fields = ['zip_code', 'poultry_fmt']
+    tooltip_aliases = ['Zip Code:', 'Poultry Susceptibility:']
+    if 'population' in gdf.columns:
+        map_gdf['population_fmt'] = gdf['population'].map('{:,.0f}'.format)
+        tooltip_fields.append('population_fmt')
+        tooltip_aliases.append('Population:')
+    
+    # Color scale for the scores, also shown as the map legend
+    colormap = branca.colormap.linear.Reds_09.scale(
+        gdf['poultry_susceptibility'].min(), gdf['poultry_susceptibility'].max()
+    )
+    colormap.caption = 'Poultry Susceptibility Score'
     
-    # Add popups
-    for idx, row in gdf.iterrows():
-        popup_text = (
-            f"<b>Zip Code:</b> {row['zip_code']}<br>"
-            f"<b>Poultry Susceptibility:</b> {row['poultry_susceptibility']:.0f}<br>"
-            f"<b>Population:</b> {row.get('population', 'N/A'):,.0f}"
+    def style_function(feature):
+        value = feature['properties']['poultry_susceptibility']
+        return {
+            'fillColor': 'lightgray' if pd.isna(value) else colormap(value),
+            'color': 'black',
+            'weight': 1,
+            'fillOpacity': 0.7
+        }
+    
+    # Add the zip codes as a single GeoJson layer, serialized once and
+    # styled from each feature's score, with a tooltip per feature
+    folium.GeoJson(
+        map_gdf,
+        style_function=style_function,
+        highlight_function=lambda feature: {'weight': 3, 'fillOpacity': 0.9},
+        tooltip=folium.GeoJsonTooltip(
+            fields=tooltip_fields,
+            aliases=tooltip_aliases,
+            sticky=True
         )
-        
-        folium.GeoJson(
-            row.geometry,
-            style_function=lambda feature: {
-                'fillColor': 'transparent',
-                'color': 'black',
-                'weight': 1,
-                'fillOpacity': 0
-            },
-            tooltip=folium.Tooltip(popup_text, sticky=True)
-        ).add_to(m)
+    ).add_to(m)
+    colormap.add_to(m)
     
     # Save
     m.save(output_path)
@@ -183,11 +263,16 @@ def main():
     print("Poultry Susceptibility Visualization")
     print("=" * 60)
     
+    # Load the data once for both maps
+    gdf = load_poultry_data()
+    if gdf is None:
+        return
+    
     # Create static map
-    create_poultry_susceptibility_map()
+    create_poultry_susceptibility_map(gdf=gdf)
     
     # Create interactive map
-    create_interactive_poultry_map()
+    create_interactive_poultry_map(gdf=gdf)
     
     print("\n" + "=" * 60)
     print("Visualizations complete!")
@@ -0,0 +1,6 @@
+"""Shared setup for the tests: make the scripts in src importable."""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
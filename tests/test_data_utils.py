@@ -0,0 +1,101 @@
+"""Tests for data_utils."""
+
+import os
+
+import geopandas as gpd
+import numpy as np
+import pandas as pd
+import pytest
+import shapely
+
+from data_utils import (
+    calculate_area_from_geometry,
+    calculate_bird_density_from_facilities,
+    calculate_water_proximity,
+    file_info,
+    find_processed_file,
+    prepare_risk_data,
+)
+
+
+def make_zip_gdf(crs='EPSG:4326'):
+    """Three small adjacent zip code squares near NYC."""
+    boxes = [shapely.box(-74.0 + 0.01 * i, 40.7, -73.99 + 0.01 * i, 40.71) for i in range(3)]
+    return gpd.GeoDataFrame(
+        {'zip_code': ['10001', '10002', '10003'], 'population': [100, 200, 300]},
+        geometry=boxes,
+        crs=crs,
+    )
+
+
+def test_prepare_risk_data_without_crs_keeps_given_area():
+    gdf = make_zip_gdf(crs=None)
+    gdf['area_km2'] = [1.0, 2.0, 3.0]
+    
+    result = prepare_risk_data(gdf)
+    
+    np.testing.assert_allclose(result['area_km2'], [1.0, 2.0, 3.0])
+    assert (result['bird_density'] == 0).all()
+    assert (result['water_proximity'] == 0).all()
+
+
+def test_prepare_risk_data_matches_unshared_helpers():
+    gdf = make_zip_gdf()
+    facilities = gpd.GeoDataFrame(
+        geometry=gpd.points_from_xy([-73.995, -73.994, -73.985], [40.705] * 3),
+        crs='EPSG:4326',
+    )
+    water = gpd.GeoDataFrame(
+        geometry=[shapely.box(-73.97, 40.70, -73.96, 40.71)],
+        crs='EPSG:4326',
+    )
+    
+    result = prepare_risk_data(gdf, facilities_gdf=facilities, water_bodies_gdf=water)
+    
+    # Each helper on its own, projecting the zip codes itself
+    expected = gdf.copy()
+    expected['area_km2'] = calculate_area_from_geometry(gdf)
+    np.testing.assert_allclose(result['area_km2'], expected['area_km2'], rtol=1e-6)
+    np.testing.assert_allclose(
+        result['bird_density'],
+        calculate_bird_density_from_facilities(expected, facilities),
+        rtol=1e-6,
+    )
+    np.testing.assert_allclose(
+        result['water_proximity'],
+        calculate_water_proximity(gdf, water),
+        rtol=1e-6,
+    )
+
+
+def test_find_processed_file_prefers_parquet(tmp_path):
+    (tmp_path / 'layer.geojson').write_text('{}')
+    (tmp_path / 'layer.parquet').write_bytes(b'')
+    os.utime(tmp_path / 'layer.geojson', ns=(1_000_000_000, 1_000_000_000))
+    
+    assert find_processed_file('layer', str(tmp_path)) == tmp_path / 'layer.parquet'
+
+
+def test_find_processed_file_skips_stale_parquet(tmp_path):
+    (tmp_path / 'layer.parquet').write_bytes(b'')
+    (tmp_path / 'layer.geojson').write_text('{}')
+    os.utime(tmp_path / 'layer.parquet', ns=(1_000_000_000, 1_000_000_000))
+    
+    assert find_processed_file('layer', str(tmp_path)) == tmp_path / 'layer.geojson'
+
+
+def test_find_processed_file_missing(tmp_path):
+    assert find_processed_file('layer', str(tmp_path)) is None
+
+
+def test_file_info_uses_callers_cache(tmp_path):
+    path = tmp_path / 'data.csv'
+    cache = {}
+    
+    assert file_info(path, cache) == (False, 0, 0)
+    path.write_text('a,b\n')
+    # Cached for as long as the caller keeps the dict...
+    assert file_info(path, cache) == (False, 0, 0)
+    # ...while calls without one always stat the file
+    exists, size, _ = file_info(path)
+    assert exists and size == 4
@@ -0,0 +1,46 @@
+"""Tests for prepare_for_sharing."""
+
+import zipfile
+
+from prepare_for_sharing import deflate_module, write_streamed
+
+
+def test_write_streamed_applies_compresslevel(tmp_path):
+    source = tmp_path / 'map.html'
+    source.write_text(''.join(f'<div id="zip{i}">{i * 7919 % 1000}</div>\n' for i in range(20000)))
+    
+    sizes = {}
+    for level in (1, 9):
+        archive = tmp_path / f'level{level}.zip'
+        with zipfile.ZipFile(archive, 'w') as zipf:
+            write_streamed(zipf, source, 'map.html', zipfile.ZIP_DEFLATED, level)
+        with zipfile.ZipFile(archive) as zipf:
+            assert zipf.read('map.html') == source.read_bytes()
+            sizes[level] = zipf.getinfo('map.html').compress_size
+    
+    assert sizes[9] < sizes[1]
+
+
+def test_deflate_module_restores_zlib(tmp_path):
+    original = zipfile.zlib
+    
+    class RecordingZlib:
+        """Stand-in zlib module that records compressor creation."""
+        calls = 0
+        
+        def __getattr__(self, name):
+            return getattr(original, name)
+        
+        def compressobj(self, *args, **kwargs):
+            RecordingZlib.calls += 1
+            return original.compressobj(*args, **kwargs)
+    
+    source = tmp_path / 'map.html'
+    source.write_text('<html></html>\n' * 100)
+    with zipfile.ZipFile(tmp_path / 'out.zip', 'w') as zipf:
+        with deflate_module(RecordingZlib()):
+            write_streamed(zipf, source, 'map.html', zipfile.ZIP_DEFLATED, 3)
+        zipf.writestr('README.txt', 'text', compress_type=zipfile.ZIP_DEFLATED)
+    
+    assert RecordingZlib.calls == 1
+    assert zipfile.zlib is original
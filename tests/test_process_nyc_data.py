@@ -0,0 +1,34 @@
+"""Tests for process_nyc_data."""
+
+import geopandas as gpd
+import numpy as np
+import pandas as pd
+import shapely
+
+from process_nyc_data import load_modzcta_data
+
+
+def test_load_modzcta_data_geodesic_area(tmp_path):
+    square = shapely.box(-74.0, 40.7, -73.9, 40.8)
+    # One clockwise and one counter-clockwise part, and a clockwise
+    # exterior with a counter-clockwise hole
+    mixed = shapely.MultiPolygon([
+        shapely.orient_polygons(square, exterior_cw=True),
+        shapely.affinity.translate(square, xoff=0.2),
+    ])
+    hole = shapely.box(-73.97, 40.73, -73.93, 40.77)
+    holed = shapely.orient_polygons(square.difference(hole), exterior_cw=True)
+    geoms = [square, mixed, holed]
+    csv = tmp_path / 'modzcta.csv'
+    pd.DataFrame({
+        'MODZCTA': [10001, 10002, 10003],
+        'pop_est': ['1,000', '2,000', '3,000'],
+        'the_geom': shapely.to_wkt(geoms),
+    }).to_csv(csv, index=False)
+    
+    gdf = load_modzcta_data(str(csv))
+    
+    # Compare with an equal-area projection
+    expected = gpd.GeoSeries(geoms, crs='EPSG:4326').to_crs('EPSG:5070').area / 1e6
+    np.testing.assert_allclose(gdf['area_km2'], expected, rtol=5e-3)
+    assert gdf['population'].tolist() == [1000, 2000, 3000]
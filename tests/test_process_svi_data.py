@@ -0,0 +1,56 @@
+"""Tests for process_svi_data."""
+
+import os
+
+import geopandas as gpd
+import pandas as pd
+import shapely
+
+from process_svi_data import merge_with_existing_data
+
+
+def write_zip_codes(path, n):
+    gdf = gpd.GeoDataFrame(
+        {'zip_code': [f'1000{i + 1}' for i in range(n)]},
+        geometry=[shapely.box(i, 0, i + 1, 1) for i in range(n)],
+        crs='EPSG:4326',
+    )
+    gdf.to_file(path, driver='GeoJSON')
+
+
+def make_inputs(tmp_path):
+    geojson = tmp_path / 'layer.geojson'
+    write_zip_codes(geojson, 2)
+    svi = pd.DataFrame({'zip_code': ['10001', '10002'], 'vulnerability_index': [0.2, 0.8]})
+    return str(geojson), svi
+
+
+def test_merge_caches_geojson_under_its_own_name(tmp_path):
+    geojson, svi = make_inputs(tmp_path)
+    
+    first = merge_with_existing_data(svi.copy(), geojson)
+    
+    # The cache must not take the upstream stage's <stem>.parquet name
+    assert (tmp_path / 'layer.svi_cache.parquet').exists()
+    assert not (tmp_path / 'layer.parquet').exists()
+    
+    second = merge_with_existing_data(svi.copy(), geojson)
+    pd.testing.assert_frame_equal(pd.DataFrame(first), pd.DataFrame(second))
+    assert first['vulnerability_index'].tolist() == [0.2, 0.8]
+
+
+def test_merge_ignores_cache_older_than_geojson(tmp_path, capsys):
+    geojson, svi = make_inputs(tmp_path)
+    merge_with_existing_data(svi.copy(), geojson)
+    
+    # Re-write the GeoJSON with a third zip code after the cache was made
+    write_zip_codes(geojson, 3)
+    cache = tmp_path / 'layer.svi_cache.parquet'
+    mtime = (tmp_path / 'layer.geojson').stat().st_mtime_ns
+    os.utime(cache, ns=(mtime - 1_000_000_000, mtime - 1_000_000_000))
+    capsys.readouterr()
+    
+    merged = merge_with_existing_data(svi.copy(), geojson)
+    
+    assert 'Using cached copy' not in capsys.readouterr().out
+    assert len(merged) == 3
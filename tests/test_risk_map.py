@@ -0,0 +1,91 @@
+"""Tests for risk_map."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from risk_map import RISK_FACTORS, RiskMap, create_sample_data
+
+
+def min_max(series):
+    """Per-factor min-max normalization as the risk map first did it."""
+    value_range = series.max() - series.min()
+    if value_range > 0:
+        return ((series - series.min()) / value_range).fillna(0)
+    return pd.Series(0.0, index=series.index)
+
+
+@pytest.mark.parametrize('method', ['min_max', 'z_score'])
+def test_normalize_risk_factor_array_matches_series(method):
+    rng = np.random.default_rng(0)
+    values = rng.random((20, 3)) * [1, 100, 0]  # Last column is constant
+    risk_map = RiskMap()
+    
+    normalized = risk_map.normalize_risk_factor(values, method)
+    
+    for j in range(values.shape[1]):
+        expected = risk_map.normalize_risk_factor(pd.Series(values[:, j]), method)
+        np.testing.assert_allclose(normalized[:, j], expected)
+
+
+def test_calculate_risk_scores_normalizes_each_factor():
+    data = create_sample_data(30)
+    data['bird_density'] = 5.0  # A constant factor normalizes to 0
+    
+    results = RiskMap(data).calculate_risk_scores()
+    
+    density = data['population'] / data['area_km2']
+    np.testing.assert_allclose(results['population_density_norm'], min_max(density), atol=1e-6)
+    assert (results['bird_density_norm'] == 0).all()
+    np.testing.assert_allclose(
+        results['healthcare_capacity_norm'], 1 - min_max(data['healthcare_capacity']), atol=1e-6
+    )
+
+
+def test_calculate_risk_scores_uses_normalize_override():
+    class ZScoreRiskMap(RiskMap):
+        def normalize_risk_factor(self, series, method='min_max'):
+            return super().normalize_risk_factor(series, 'z_score')
+    
+    data = create_sample_data(30)
+    
+    results = ZScoreRiskMap(data).calculate_risk_scores()
+    
+    expected = RiskMap().normalize_risk_factor(data['vulnerability_index'], 'z_score')
+    np.testing.assert_allclose(results['vulnerability_index_norm'], expected, atol=1e-6)
+
+
+def test_risk_score_is_weighted_sum_of_normalized_factors():
+    data = create_sample_data(40)
+    weights = {
+        'population_density': 0.1,
+        'bird_density': 0.2,
+        'water_proximity': 0.3,
+        'healthcare_capacity': 0.15,
+        'vulnerability_index': 0.25
+    }
+    
+    results = RiskMap(data, risk_weights=weights).calculate_risk_scores()
+    
+    expected = sum(
+        results[f'{factor}_norm'].astype(np.float64) * weights[factor]
+        for factor in RISK_FACTORS
+    )
+    np.testing.assert_allclose(results['risk_score'], expected.clip(upper=1), atol=1e-6)
+    expected_category = pd.cut(
+        results['risk_score'],
+        bins=[0, 0.25, 0.5, 0.75, 1.0],
+        labels=['Low', 'Medium', 'High', 'Very High']
+    )
+    assert (results['risk_category'].astype(str) == expected_category.astype(str)).all()
+
+
+def test_weighted_sum_skips_missing_factors():
+    data = create_sample_data(10).drop(columns=['bird_density', 'water_proximity'])
+    
+    results = RiskMap(data).calculate_risk_scores()
+    
+    assert (results['bird_density_norm'] == 0).all()
+    assert (results['water_proximity_norm'] == 0).all()
+    assert 'bird_density' not in results.columns
+    assert results['risk_score'].between(0, 1).all()
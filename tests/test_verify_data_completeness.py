@@ -0,0 +1,54 @@
+"""Tests for verify_data_completeness."""
+
+import pytest
+
+import verify_data_completeness
+
+
+def test_check_all_data_sees_files_added_between_runs(tmp_path, monkeypatch, capsys):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / 'data' / 'raw').mkdir(parents=True)
+    
+    verify_data_completeness.check_all_data()
+    assert 'Healthcare data: data/raw/nyc_hospitals.csv' not in capsys.readouterr().out
+    
+    (tmp_path / 'data' / 'raw' / 'nyc_hospitals.csv').write_text('name\nA\n')
+    verify_data_completeness.check_all_data()
+    assert 'Healthcare data: data/raw/nyc_hospitals.csv' in capsys.readouterr().out
+
+
+@pytest.fixture
+def svi_csv(tmp_path, monkeypatch):
+    """A tiny SVI CSV in a fresh working directory."""
+    monkeypatch.chdir(tmp_path)
+    verify_data_completeness.load_manifest.cache_clear()
+    (tmp_path / 'data' / 'raw').mkdir(parents=True)
+    path = 'data/raw/NewYork_ZCTA.csv'
+    (tmp_path / path).write_text('FIPS,RPL_THEMES\n10001,0.5\n10002,0.7\n')
+    yield path
+    verify_data_completeness.load_manifest.cache_clear()
+
+
+def test_check_all_data_writes_no_manifest_by_default(svi_csv):
+    verify_data_completeness.check_all_data()
+    
+    assert not verify_data_completeness.MANIFEST_FILE.exists()
+
+
+def test_probe_csv_reuses_saved_manifest(svi_csv, monkeypatch):
+    result = verify_data_completeness.probe_csv(svi_csv, write_manifest=True)
+    assert result == (['FIPS', 'RPL_THEMES'], 2)
+    assert verify_data_completeness.MANIFEST_FILE.exists()
+    
+    # A fresh process (no in-memory manifest) answers from the saved file
+    verify_data_completeness.load_manifest.cache_clear()
+    monkeypatch.setattr(verify_data_completeness, 'count_lines', None)
+    assert verify_data_completeness.probe_csv(svi_csv) == (['FIPS', 'RPL_THEMES'], 2)
+
+
+def test_save_manifest_refreshes_loaded_manifest(svi_csv):
+    assert verify_data_completeness.load_manifest() == {}
+    
+    verify_data_completeness.save_manifest({'a.csv': {'size': 1}})
+    
+    assert verify_data_completeness.load_manifest() == {'a.csv': {'size': 1}}